@@ -700,13 +700,9 @@ def validate_unfinished_header_block(
             curr = blocks.block_record(curr.prev_hash)
 
         # The first block to have an sp > the last tx block's infusion iters, is a tx block
-        if overflow:
-            our_sp_total_iters: uint128 = uint128(total_iters - ip_iters + sp_iters - expected_sub_slot_iters)
-        else:
-            our_sp_total_iters = uint128(total_iters - ip_iters + sp_iters)
-        if (our_sp_total_iters > curr.total_iters) != (header_block.foliage.foliage_transaction_block_hash is not None):
+        if (sp_total_iters > curr.total_iters) != (header_block.foliage.foliage_transaction_block_hash is not None):
             return None, ValidationError(Err.INVALID_IS_TRANSACTION_BLOCK)
-        if (our_sp_total_iters > curr.total_iters) != (
+        if (sp_total_iters > curr.total_iters) != (
             header_block.foliage.foliage_transaction_block_signature is not None
         ):
             return None, ValidationError(Err.INVALID_IS_TRANSACTION_BLOCK)
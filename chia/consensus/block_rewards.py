@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Tuple
+
 from chia.util.ints import uint32, uint64
 
 # 1 Hydrangea coin = 1,000,000,000,000 = 1 trillion mojo.
@@ -7,31 +11,61 @@ _mojo_per_hydrangea = 1000000000000
 _prefarm = 21000000
 _blocks_per_year = 1681920  # 32 * 6 * 24 * 365
 _block_reward = 125 # 125 Hydrangea are awarded per block + 0.1% to the TimeLord
-_farmer_fraction = (10 / _block_reward)
-_pool_fraction = (90 / _block_reward)
-_community_fraction = (20 / _block_reward)
-_staking_fraction = (5 / _block_reward)
-_timelord_fraction = ((1 / 1000) / _block_reward)
-
-def _calculate_reward(fraction, height: uint32) -> uint64:
-    """
-    Returns the block reward for a given reward fraction at a certain block height.
-    These halving events will not be hit at the exact times
-    (3 years, etc), due to fluctuations in difficulty. They will likely come early, if the network space and VDF
-    rates increase continuously.
-    """
-    if height == 0:
-        return uint64(int(fraction * _prefarm * _mojo_per_hydrangea))
-    elif height < 3 * _blocks_per_year:
-        return uint64(int(fraction * _block_reward * _mojo_per_hydrangea))
-    elif height < 6 * _blocks_per_year:
-        return uint64(int(fraction * (_block_reward / 2) * _mojo_per_hydrangea))
-    elif height < 9 * _blocks_per_year:
-        return uint64(int(fraction * (_block_reward / 4) * _mojo_per_hydrangea))
-    elif height < 12 * _blocks_per_year:
-        return uint64(int(fraction * (_block_reward / 8) * _mojo_per_hydrangea))
-    else:
-        return uint64(int(fraction * (_block_reward / 16) * _mojo_per_hydrangea))
+# Per block rewards in mojo during the first era. Kept as integers so no float rounding leaks into the rewards.
+_farmer_reward = 10 * _mojo_per_hydrangea
+_pool_reward = 90 * _mojo_per_hydrangea
+_community_reward = 20 * _mojo_per_hydrangea
+_staking_reward = 5 * _mojo_per_hydrangea
+_timelord_reward = _mojo_per_hydrangea // 1000
+
+# Heights at which the block reward halves. These halving events will not be hit at the exact times
+# (3 years, etc), due to fluctuations in difficulty. They will likely come early, if the network space and VDF
+# rates increase continuously.
+_ERA_BOUNDS: Tuple[int, ...] = (
+    3 * _blocks_per_year,
+    6 * _blocks_per_year,
+    9 * _blocks_per_year,
+    12 * _blocks_per_year,
+)
+
+
+def _reward_table(first_era_reward: int) -> Tuple[uint64, ...]:
+    """
+    Returns the rewards for a given first era per block reward (in mojo), indexed by era: the prefarm share
+    (height 0) followed by one entry per halving era.
+    """
+    return (uint64(first_era_reward * _prefarm // _block_reward),) + tuple(
+        uint64(first_era_reward >> era) for era in range(len(_ERA_BOUNDS) + 1)
+    )
+
+
+# All reward tables are computed once at import and never change afterwards.
+_REWARD_TABLES: Mapping[str, Tuple[uint64, ...]] = MappingProxyType(
+    {
+        "pool": _reward_table(_pool_reward),
+        "community": _reward_table(_community_reward),
+        "staking": _reward_table(_staking_reward),
+        "farmer": _reward_table(_farmer_reward),
+        "timelord": _reward_table(_timelord_reward),
+    }
+)
+_POOL_TABLE = _REWARD_TABLES["pool"]
+_COMMUNITY_TABLE = _REWARD_TABLES["community"]
+_STAKING_TABLE = _REWARD_TABLES["staking"]
+_FARMER_TABLE = _REWARD_TABLES["farmer"]
+_TIMELORD_TABLE = _REWARD_TABLES["timelord"]
+
+
+def _era_index(height: uint32) -> int:
+    """
+    Returns the index into a reward table for a block height: 0 for the prefarm (height 0), otherwise the halving era
+    plus one.
+    """
+    return 0 if height == 0 else bisect_right(_ERA_BOUNDS, height) + 1
+
+
+def _rewards_for_heights(table: Tuple[uint64, ...], heights: Iterable[uint32]) -> List[uint64]:
+    return [table[_era_index(height)] for height in heights]
 
 
 def calculate_pool_reward(height: uint32) -> uint64:
@@ -39,29 +73,60 @@ def calculate_pool_reward(height: uint32) -> uint64:
     Returns the pool reward at a certain block height. If the farmer
     is solo farming, they act as the pool, and therefore earn the entire block reward.
     """
-    return _calculate_reward(_pool_fraction, height)
+    return _POOL_TABLE[_era_index(height)]
 
 def calculate_community_reward(height: uint32) -> uint64:
     """
     Returns the community reward at a certain block height.
     """
-    return _calculate_reward(_community_fraction, height)
+    return _COMMUNITY_TABLE[_era_index(height)]
 
 def calculate_staking_reward(height: uint32) -> uint64:
     """
     Returns the staking reward at a certain block height.
     """
-    return _calculate_reward(_staking_fraction, height)
+    return _STAKING_TABLE[_era_index(height)]
 
 def calculate_base_farmer_reward(height: uint32) -> uint64:
     """
     Returns the base farmer reward at a certain block height.
     Returns the coinbase reward at a certain block height.
     """
-    return _calculate_reward(_farmer_fraction, height)
+    return _FARMER_TABLE[_era_index(height)]
 
 def calculate_timelord_reward(height: uint32) -> uint64:
     """
     Returns the timelord reward at a certain block height.
     """
-    return _calculate_reward(_timelord_fraction, height)
\ No newline at end of file
+    return _TIMELORD_TABLE[_era_index(height)]
+
+
+def calculate_pool_rewards(heights: Iterable[uint32]) -> List[uint64]:
+    """
+    Returns the pool rewards for a batch of block heights, in the same order as the heights.
+    """
+    return _rewards_for_heights(_POOL_TABLE, heights)
+
+def calculate_community_rewards(heights: Iterable[uint32]) -> List[uint64]:
+    """
+    Returns the community rewards for a batch of block heights, in the same order as the heights.
+    """
+    return _rewards_for_heights(_COMMUNITY_TABLE, heights)
+
+def calculate_staking_rewards(heights: Iterable[uint32]) -> List[uint64]:
+    """
+    Returns the staking rewards for a batch of block heights, in the same order as the heights.
+    """
+    return _rewards_for_heights(_STAKING_TABLE, heights)
+
+def calculate_base_farmer_rewards(heights: Iterable[uint32]) -> List[uint64]:
+    """
+    Returns the base farmer rewards for a batch of block heights, in the same order as the heights.
+    """
+    return _rewards_for_heights(_FARMER_TABLE, heights)
+
+def calculate_timelord_rewards(heights: Iterable[uint32]) -> List[uint64]:
+    """
+    Returns the timelord rewards for a batch of block heights, in the same order as the heights.
+    """
+    return _rewards_for_heights(_TIMELORD_TABLE, heights)
@@ -250,6 +250,8 @@ class BlockStore:
                 "INSERT OR REPLACE INTO sub_epoch_segments_v3 VALUES(?, ?)",
                 (self.maybe_to_hex(ses_block_hash), bytes(SubEpochSegments(segments))),
             )
+        # the weight proof handler reads the segments back right after creating them
+        self.ses_challenge_cache.put(ses_block_hash, segments)
 
     async def get_sub_epoch_challenge_segments(
         self,
@@ -922,6 +922,8 @@ class FullNode:
         # same for mempool_manager
         if self._mempool_manager is not None:
             self.mempool_manager.shut_down()
+        if self.weight_proof_handler is not None:
+            self.weight_proof_handler.shut_down()
 
         if self.full_node_peers is not None:
             asyncio.create_task(self.full_node_peers.close())
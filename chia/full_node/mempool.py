@@ -66,9 +66,9 @@ class Mempool:
                 if len(self.removals[rem_name]) == 0:
                     del self.removals[rem_name]
             del self.spends[item.name]
-            del self.sorted_spends[item.fee_per_cost][item.name]
             dic = self.sorted_spends[item.fee_per_cost]
-            if len(dic.values()) == 0:
+            del dic[item.name]
+            if len(dic) == 0:
                 del self.sorted_spends[item.fee_per_cost]
             self.total_mempool_cost -= item.cost
             assert self.total_mempool_cost >= 0
@@ -89,10 +89,7 @@ class Mempool:
         self.spends[item.name] = item
 
         # sorted_spends is Dict[float, Dict[bytes32, MempoolItem]]
-        if item.fee_per_cost not in self.sorted_spends:
-            self.sorted_spends[item.fee_per_cost] = {}
-
-        self.sorted_spends[item.fee_per_cost][item.name] = item
+        self.sorted_spends.setdefault(item.fee_per_cost, {})[item.name] = item
 
         for coin in item.removals:
             coin_id = coin.name()
@@ -4,13 +4,16 @@ from dataclasses import dataclass
 from typing import Optional
 
 from chia.types.blockchain_format.vdf import VDFInfo, VDFProof
-from chia.util.streamable import Streamable, streamable
+from chia.util.streamable import PackedStreamable, streamable
 from chia.types.blockchain_format.sized_bytes import bytes32
 
 
 @streamable
 @dataclass(frozen=True)
-class SignagePoint(Streamable):
+class SignagePoint(PackedStreamable):
+    # Signage points are kept in large numbers in the full node store, so avoid a `__dict__` per instance.
+    __slots__ = ("cc_vdf", "cc_proof", "rc_vdf", "rc_proof", "timelord_puzzle_hash")
+
     cc_vdf: Optional[VDFInfo]
     cc_proof: Optional[VDFProof]
     rc_vdf: Optional[VDFInfo]
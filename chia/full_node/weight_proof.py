@@ -1,13 +1,17 @@
 import asyncio
+from bisect import bisect_left, bisect_right
 import dataclasses
+from functools import lru_cache
+from itertools import groupby
 import logging
 import math
+from operator import attrgetter
 from multiprocessing.context import BaseContext
 import pathlib
 import random
-from concurrent.futures.process import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
 import tempfile
-from typing import Dict, IO, List, Optional, Tuple, Awaitable
+from typing import Dict, IO, List, Optional, Set, Tuple
 
 from chia.consensus.block_header_validation import validate_finished_header_block
 from chia.consensus.block_record import BlockRecord
@@ -39,7 +43,6 @@ from chia.types.weight_proof import (
     RecentChainData,
 )
 from chia.util.block_cache import BlockCache
-from chia.util.hash import std_hash
 from chia.util.ints import uint8, uint32, uint64, uint128
 from chia.util.setproctitle import getproctitle, setproctitle
 
@@ -69,6 +72,69 @@ class WeightProofHandler:
         self.lock = asyncio.Lock()
         self._num_processes = 4
         self.multiprocessing_context = multiprocessing_context
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # sub epoch segments currently being loaded or built, by ses block hash
+        self._segment_tasks: Dict[bytes32, asyncio.Task] = {}
+        # number of callers waiting on each of those tasks, a task is cancelled when its last caller goes away
+        self._segment_waiters: Dict[asyncio.Task, int] = {}
+        # sub epoch summary heights and parsed summaries, only valid for the peak they were read at
+        self._ses_cache_peak: Optional[bytes32] = None
+        self._ses_heights: Optional[List[uint32]] = None
+        self._ses_by_height: Dict[uint32, SubEpochSummary] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # the worker pool is created on first use and then reused for every weight proof we validate,
+        # so we only pay for starting the workers once
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._num_processes,
+                mp_context=self.multiprocessing_context,
+                initializer=setproctitle,
+                initargs=(f"{getproctitle()}_worker",),
+            )
+        return self._executor
+
+    def __refresh_ses_cache(self) -> None:
+        peak = self.blockchain.get_peak()
+        peak_hash = None if peak is None else peak.header_hash
+        if peak_hash != self._ses_cache_peak:
+            self._ses_cache_peak = peak_hash
+            self._ses_heights = None
+            self._ses_by_height = {}
+
+    def _get_ses_heights(self) -> List[uint32]:
+        self.__refresh_ses_cache()
+        if self._ses_heights is None:
+            self._ses_heights = self.blockchain.get_ses_heights()
+        return self._ses_heights
+
+    def _get_ses(self, height: uint32) -> SubEpochSummary:
+        self.__refresh_ses_cache()
+        ses = self._ses_by_height.get(height)
+        if ses is None:
+            ses = self.blockchain.get_ses(height)
+            self._ses_by_height[height] = ses
+        return ses
+
+    def _shutdown_executor(self) -> None:
+        # the next validation starts a new pool
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _drop_broken_executor(self, executor: ProcessPoolExecutor) -> None:
+        # every validation still running on a broken pool fails with it, but another one may already have replaced
+        # it, only the broken pool itself is shut down so validations running on its replacement are left alone
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def shut_down(self) -> None:
+        # segment builds read from the db, they must not outlive the node closing it
+        for task in self._segment_tasks.values():
+            task.cancel()
+        self._segment_tasks.clear()
+        self._shutdown_executor()
 
     async def get_proof_of_weight(self, tip: bytes32) -> Optional[WeightProof]:
 
@@ -97,7 +163,7 @@ class WeightProofHandler:
         for sub_epoch_n, ses_height in enumerate(summary_heights):
             if ses_height > tip_height:
                 break
-            ses = self.blockchain.get_ses(ses_height)
+            ses = self._get_ses(ses_height)
             log.debug("handle sub epoch summary %s at height: %s ses %s", sub_epoch_n, ses_height, ses)
             sub_epoch_data.append(_create_sub_epoch_data(ses))
         return sub_epoch_data
@@ -113,25 +179,27 @@ class WeightProofHandler:
             log.error("failed not tip in cache")
             return None
         log.info(f"create weight proof peak {tip} {tip_rec.height}")
-        recent_chain = await self._get_recent_chain(tip_rec.height)
-        if recent_chain is None:
-            return None
-
-        summary_heights = self.blockchain.get_ses_heights()
+        summary_heights = self._get_ses_heights()
         zero_hash = self.blockchain.height_to_hash(uint32(0))
         assert zero_hash is not None
-        prev_ses_block = await self.blockchain.get_block_record_from_db(zero_hash)
+        # the reads are independent of each other, issue them together instead of one after the other
+        recent_chain, prev_ses_block, ses_blocks = await asyncio.gather(
+            self._get_recent_chain(tip_rec.height),
+            self.blockchain.get_block_record_from_db(zero_hash),
+            self.blockchain.get_block_records_at(summary_heights),
+        )
+        if recent_chain is None:
+            return None
         if prev_ses_block is None:
             return None
+        if ses_blocks is None:
+            return None
         sub_epoch_data = self.get_sub_epoch_data(tip_rec.height, summary_heights)
         # use second to last ses as seed
         seed = self.get_seed_for_proof(summary_heights, tip_rec.height)
         rng = random.Random(seed)
         weight_to_check = _get_weights_for_sampling(rng, tip_rec.weight, recent_chain)
         sample_n = 0
-        ses_blocks = await self.blockchain.get_block_records_at(summary_heights)
-        if ses_blocks is None:
-            return None
 
         for sub_epoch_n, ses_height in enumerate(summary_heights):
             if ses_height > tip_rec.height:
@@ -150,15 +218,9 @@ class WeightProofHandler:
 
             if _sample_sub_epoch(prev_ses_block.weight, ses_block.weight, weight_to_check):  # type: ignore
                 sample_n += 1
-                segments = await self.blockchain.get_sub_epoch_challenge_segments(ses_block.header_hash)
+                segments = await self.__get_sub_epoch_segments(prev_ses_block, ses_block, ses_height, sub_epoch_n)
                 if segments is None:
-                    segments = await self.__create_sub_epoch_segments(ses_block, prev_ses_block, uint32(sub_epoch_n))
-                    if segments is None:
-                        log.error(
-                            f"failed while building segments for sub epoch {sub_epoch_n}, ses height {ses_height} "
-                        )
-                        return None
-                    await self.blockchain.persist_sub_epoch_challenge_segments(ses_block.header_hash, segments)
+                    return None
                 sub_epoch_segments.extend(segments)
             prev_ses_block = ses_block
         log.debug(f"sub_epochs: {len(sub_epoch_data)}")
@@ -171,7 +233,7 @@ class WeightProofHandler:
             if ses_height <= tip_height:
                 count += 1
             if count == 2:
-                ses = self.blockchain.get_ses(ses_height)
+                ses = self._get_ses(ses_height)
                 break
         assert ses is not None
         seed = ses.get_hash()
@@ -179,7 +241,7 @@ class WeightProofHandler:
 
     async def _get_recent_chain(self, tip_height: uint32) -> Optional[List[HeaderBlock]]:
         recent_chain: List[HeaderBlock] = []
-        ses_heights = self.blockchain.get_ses_heights()
+        ses_heights = self._get_ses_heights()
         min_height = 0
         count_ses = 0
         for ses_height in reversed(ses_heights):
@@ -189,8 +251,10 @@ class WeightProofHandler:
                 min_height = ses_height - 1
                 break
         log.debug(f"start {min_height} end {tip_height}")
-        headers = await self.blockchain.get_header_blocks_in_range(min_height, tip_height, tx_filter=False)
-        blocks = await self.blockchain.get_block_records_in_range(min_height, tip_height)
+        headers, blocks = await asyncio.gather(
+            self.blockchain.get_header_blocks_in_range(min_height, tip_height, tx_filter=False),
+            self.blockchain.get_block_records_in_range(min_height, tip_height),
+        )
         ses_count = 0
         curr_height = tip_height
         blocks_n = 0
@@ -202,10 +266,7 @@ class WeightProofHandler:
             assert header_hash is not None
             header_block = headers[header_hash]
             block_rec = blocks[header_block.header_hash]
-            if header_block is None:
-                log.error("creating recent chain failed")
-                return None
-            recent_chain.insert(0, header_block)
+            recent_chain.append(header_block)
             if block_rec.sub_epoch_summary_included:
                 ses_count += 1
             curr_height = uint32(curr_height - 1)
@@ -213,8 +274,9 @@ class WeightProofHandler:
 
         header_hash = self.blockchain.height_to_hash(curr_height)
         assert header_hash is not None
-        header_block = headers[header_hash]
-        recent_chain.insert(0, header_block)
+        recent_chain.append(headers[header_hash])
+        # the chain was collected walking back from the tip
+        recent_chain.reverse()
 
         log.info(
             f"recent chain, "
@@ -225,7 +287,7 @@ class WeightProofHandler:
 
     async def create_prev_sub_epoch_segments(self) -> None:
         log.debug("create prev sub_epoch_segments")
-        heights = self.blockchain.get_ses_heights()
+        heights = self._get_ses_heights()
         if len(heights) < 3:
             return None
         count = len(heights) - 2
@@ -249,7 +311,7 @@ class WeightProofHandler:
             log.error("no peak yet")
             return None
 
-        summary_heights = self.blockchain.get_ses_heights()
+        summary_heights = self._get_ses_heights()
         h_hash: Optional[bytes32] = self.blockchain.height_to_hash(uint32(0))
         if h_hash is None:
             return None
@@ -269,13 +331,47 @@ class WeightProofHandler:
             if ses_block is None or ses_block.sub_epoch_summary_included is None:
                 log.error("error while building proof")
                 return None
-            await self.__create_persist_segment(prev_ses_block, ses_block, ses_height, sub_epoch_n)
+            await self.__get_sub_epoch_segments(prev_ses_block, ses_block, ses_height, sub_epoch_n)
             prev_ses_block = ses_block
             await asyncio.sleep(2)
         log.debug("done checking segments")
         return None
 
-    async def __create_persist_segment(self, prev_ses_block, ses_block, ses_height, sub_epoch_n):
+    async def __get_sub_epoch_segments(
+        self, prev_ses_block: BlockRecord, ses_block: BlockRecord, ses_height: uint32, sub_epoch_n: int
+    ) -> Optional[List[SubEpochChallengeSegment]]:
+        # the startup check, new sub epochs and proof requests can all ask for the same sub epoch at once,
+        # later callers wait for the load or build that is already running instead of repeating it
+        ses_hash = ses_block.header_hash
+        task = self._segment_tasks.get(ses_hash)
+        if task is None:
+            task = asyncio.create_task(
+                self.__create_persist_segment(prev_ses_block, ses_block, ses_height, sub_epoch_n)
+            )
+            self._segment_tasks[ses_hash] = task
+            task.add_done_callback(lambda done_task: self.__drop_segment_task(ses_hash, done_task))
+        self._segment_waiters[task] = self._segment_waiters.get(task, 0) + 1
+        try:
+            # shielded, a caller that is cancelled (e.g. a timed out proof request) must not cancel the build for
+            # the other callers waiting on it
+            segments: Optional[List[SubEpochChallengeSegment]] = await asyncio.shield(task)
+        finally:
+            waiters = self._segment_waiters.pop(task) - 1
+            if waiters > 0:
+                self._segment_waiters[task] = waiters
+            elif not task.done():
+                # the last caller is gone, nobody is waiting for the build anymore
+                task.cancel()
+        return segments
+
+    def __drop_segment_task(self, ses_hash: bytes32, task: asyncio.Task) -> None:
+        # a later build for the same sub epoch may have been started after this one was cancelled
+        if self._segment_tasks.get(ses_hash) is task:
+            del self._segment_tasks[ses_hash]
+
+    async def __create_persist_segment(
+        self, prev_ses_block: BlockRecord, ses_block: BlockRecord, ses_height: uint32, sub_epoch_n: int
+    ) -> Optional[List[SubEpochChallengeSegment]]:
         segments = await self.blockchain.get_sub_epoch_challenge_segments(ses_block.header_hash)
         if segments is None:
             segments = await self.__create_sub_epoch_segments(ses_block, prev_ses_block, uint32(sub_epoch_n))
@@ -283,28 +379,41 @@ class WeightProofHandler:
                 log.error(f"failed while building segments for sub epoch {sub_epoch_n}, ses height {ses_height} ")
                 return None
             await self.blockchain.persist_sub_epoch_challenge_segments(ses_block.header_hash, segments)
+        return segments
 
     async def __create_sub_epoch_segments(
         self, ses_block: BlockRecord, se_start: BlockRecord, sub_epoch_n: uint32
     ) -> Optional[List[SubEpochChallengeSegment]]:
         segments: List[SubEpochChallengeSegment] = []
         start_height = await self.get_prev_two_slots_height(se_start)
-
-        blocks = await self.blockchain.get_block_records_in_range(
-            start_height, ses_block.height + self.constants.MAX_SUB_SLOT_BLOCKS
-        )
-        header_blocks = await self.blockchain.get_header_blocks_in_range(
-            start_height, ses_block.height + self.constants.MAX_SUB_SLOT_BLOCKS, tx_filter=False
-        )
-        curr: Optional[HeaderBlock] = header_blocks[se_start.header_hash]
+        end_height = ses_block.height + self.constants.MAX_SUB_SLOT_BLOCKS
+
+        blocks = await self.blockchain.get_block_records_in_range(start_height, end_height)
+        header_blocks = await self.blockchain.get_header_blocks_in_range(start_height, end_height, tx_filter=False)
+        # the segment builders walk the range height by height, index the header blocks by height - start_height
+        # once instead of resolving height -> hash -> header block for every step
+        header_block_by_height = [header_blocks[h] for h in self._get_hashes_in_range(start_height, end_height)]
+        # both the segment loop and __slot_end_vdf classify the same blocks, do it once up front
+        challenge_blocks = {h for h, rec in blocks.items() if rec.is_challenge_block(self.constants)}
+        block_cache = BlockCache(blocks)
+        curr = header_blocks[se_start.header_hash]
         height = se_start.height
-        assert curr is not None
         first = True
         idx = 0
         while curr.height < ses_block.height:
-            if blocks[curr.header_hash].is_challenge_block(self.constants):
+            if curr.header_hash in challenge_blocks:
                 log.debug(f"challenge segment {idx}, starts at {curr.height} ")
-                seg, height = await self._create_challenge_segment(curr, sub_epoch_n, header_blocks, blocks, first)
+                seg, height = await self._create_challenge_segment(
+                    curr,
+                    sub_epoch_n,
+                    header_blocks,
+                    blocks,
+                    header_block_by_height,
+                    start_height,
+                    challenge_blocks,
+                    block_cache,
+                    first,
+                )
                 if seg is None:
                     log.error(f"failed creating segment {curr.header_hash} ")
                     return None
@@ -313,14 +422,20 @@ class WeightProofHandler:
                 first = False
             else:
                 height = height + uint32(1)  # type: ignore
-            header_hash = self.blockchain.height_to_hash(height)
-            assert header_hash is not None
-            curr = header_blocks[header_hash]
-            if curr is None:
-                return None
+            curr = header_block_by_height[height - start_height]
         log.debug(f"next sub epoch starts at {height}")
         return segments
 
+    def _get_hashes_in_range(self, start: int, stop: int) -> List[bytes32]:
+        # main chain header hashes for heights start..stop, cut short at the peak
+        hashes: List[bytes32] = []
+        for height in range(start, stop + 1):
+            header_hash = self.blockchain.height_to_hash(uint32(height))
+            if header_hash is None:
+                break
+            hashes.append(header_hash)
+        return hashes
+
     async def get_prev_two_slots_height(self, se_start: BlockRecord) -> uint32:
         # find prev 2 slots height
         slot = 0
@@ -345,6 +460,10 @@ class WeightProofHandler:
         sub_epoch_n: uint32,
         header_blocks: Dict[bytes32, HeaderBlock],
         blocks: Dict[bytes32, BlockRecord],
+        header_block_by_height: List[HeaderBlock],
+        start_height: uint32,
+        challenge_blocks: Set[bytes32],
+        block_cache: BlockCache,
         first_segment_in_sub_epoch: bool,
     ) -> Tuple[Optional[SubEpochChallengeSegment], uint32]:
         assert self.blockchain is not None
@@ -352,7 +471,7 @@ class WeightProofHandler:
         log.debug(f"create challenge segment block {header_block.header_hash} block height {header_block.height} ")
         # VDFs from sub slots before challenge block
         first_sub_slots, first_rc_end_of_slot_vdf = await self.__first_sub_slot_vdfs(
-            header_block, header_blocks, blocks, first_segment_in_sub_epoch
+            header_block, header_blocks, blocks, header_block_by_height, start_height, first_segment_in_sub_epoch
         )
         if first_sub_slots is None:
             log.error("failed building first sub slots")
@@ -365,6 +484,7 @@ class WeightProofHandler:
             header_block,
             blocks[header_block.header_hash],
             blocks,
+            block_cache,
         )
 
         sub_slots.append(ssd)
@@ -373,7 +493,12 @@ class WeightProofHandler:
         log.debug(f"create slot end vdf for block {header_block.header_hash} height {header_block.height} ")
 
         challenge_slot_end_sub_slots, end_height = await self.__slot_end_vdf(
-            uint32(header_block.height + 1), header_blocks, blocks
+            uint32(header_block.height + 1),
+            blocks,
+            header_block_by_height,
+            start_height,
+            challenge_blocks,
+            block_cache,
         )
         if challenge_slot_end_sub_slots is None:
             log.error("failed building slot end ")
@@ -392,6 +517,8 @@ class WeightProofHandler:
         header_block: HeaderBlock,
         header_blocks: Dict[bytes32, HeaderBlock],
         blocks: Dict[bytes32, BlockRecord],
+        header_block_by_height: List[HeaderBlock],
+        start_height: uint32,
         first_in_sub_epoch: bool,
     ) -> Tuple[Optional[List[SubSlotData]], Optional[VDFInfo]]:
         # combine cc vdfs of all reward blocks from the start of the sub slot to end
@@ -402,7 +529,10 @@ class WeightProofHandler:
         if first_in_sub_epoch and curr_sub_rec.height > 0:
             while not curr_sub_rec.sub_epoch_summary_included:
                 curr_sub_rec = blocks[curr_sub_rec.prev_hash]
-            first_rc_end_of_slot_vdf = self.first_rc_end_of_slot_vdf(header_block, blocks, header_blocks)
+            # the walk above stopped at the block that included the sub epoch summary, its last sub slot ends
+            # the previous sub epoch
+            ses_header_block = header_blocks[curr_sub_rec.header_hash]
+            first_rc_end_of_slot_vdf = ses_header_block.finished_sub_slots[-1].reward_chain.end_of_slot_vdf
         else:
             if header_block_sub_rec.overflow and header_block_sub_rec.first_in_sub_slot:
                 sub_slots_num = 2
@@ -419,9 +549,6 @@ class WeightProofHandler:
         sub_slots_data: List[SubSlotData] = []
         tmp_sub_slots_data: List[SubSlotData] = []
         while curr.height < header_block.height:
-            if curr is None:
-                log.error("failed fetching block")
-                return None, None
             if curr.first_in_sub_slot:
                 # if not blue boxed
                 if not blue_boxed_end_of_slot(curr.finished_sub_slots[0]):
@@ -449,9 +576,7 @@ class WeightProofHandler:
                 curr.total_iters,
             )
             tmp_sub_slots_data.append(ssd)
-            header_hash = self.blockchain.height_to_hash(uint32(curr.height + 1))
-            assert header_hash is not None
-            curr = header_blocks[header_hash]
+            curr = header_block_by_height[curr.height + 1 - start_height]
 
         if len(tmp_sub_slots_data) > 0:
             sub_slots_data.extend(tmp_sub_slots_data)
@@ -464,45 +589,34 @@ class WeightProofHandler:
 
         return sub_slots_data, first_rc_end_of_slot_vdf
 
-    def first_rc_end_of_slot_vdf(
+    async def __slot_end_vdf(
         self,
-        header_block,
+        start_height: uint32,
         blocks: Dict[bytes32, BlockRecord],
-        header_blocks: Dict[bytes32, HeaderBlock],
-    ) -> Optional[VDFInfo]:
-        curr = blocks[header_block.header_hash]
-        while curr.height > 0 and not curr.sub_epoch_summary_included:
-            curr = blocks[curr.prev_hash]
-        return header_blocks[curr.header_hash].finished_sub_slots[-1].reward_chain.end_of_slot_vdf
-
-    async def __slot_end_vdf(
-        self, start_height: uint32, header_blocks: Dict[bytes32, HeaderBlock], blocks: Dict[bytes32, BlockRecord]
+        header_block_by_height: List[HeaderBlock],
+        header_block_by_height_start: uint32,
+        challenge_blocks: Set[bytes32],
+        block_cache: BlockCache,
     ) -> Tuple[Optional[List[SubSlotData]], uint32]:
         # gets all vdfs first sub slot after challenge block to last sub slot
         log.debug(f"slot end vdf start height {start_height}")
-        header_hash = self.blockchain.height_to_hash(start_height)
-        assert header_hash is not None
-        curr = header_blocks[header_hash]
+        curr = header_block_by_height[start_height - header_block_by_height_start]
         curr_header_hash = curr.header_hash
         sub_slots_data: List[SubSlotData] = []
         tmp_sub_slots_data: List[SubSlotData] = []
-        while not blocks[curr_header_hash].is_challenge_block(self.constants):
+        while curr_header_hash not in challenge_blocks:
             if curr.first_in_sub_slot:
                 sub_slots_data.extend(tmp_sub_slots_data)
 
-                curr_prev_header_hash = curr.prev_header_hash
-                # add collected vdfs
-                for idx, sub_slot in enumerate(curr.finished_sub_slots):
-                    prev_rec = blocks[curr_prev_header_hash]
-                    eos_vdf_iters = prev_rec.sub_slot_iters
-                    if idx == 0:
-                        eos_vdf_iters = uint64(prev_rec.sub_slot_iters - prev_rec.ip_iters(self.constants))
+                # add collected vdfs, only the first slot is partial (after the infusion point of prev block)
+                prev_rec = blocks[curr.prev_header_hash]
+                eos_vdf_iters = uint64(prev_rec.sub_slot_iters - prev_rec.ip_iters(self.constants))
+                for sub_slot in curr.finished_sub_slots:
                     sub_slots_data.append(handle_end_of_slot(sub_slot, eos_vdf_iters))
+                    eos_vdf_iters = prev_rec.sub_slot_iters
                 tmp_sub_slots_data = []
-            tmp_sub_slots_data.append(self.handle_block_vdfs(curr, blocks))
-            header_hash = self.blockchain.height_to_hash(uint32(curr.height + 1))
-            assert header_hash is not None
-            curr = header_blocks[header_hash]
+            tmp_sub_slots_data.append(self.handle_block_vdfs(curr, blocks, block_cache))
+            curr = header_block_by_height[curr.height + 1 - header_block_by_height_start]
             curr_header_hash = curr.header_hash
 
         if len(tmp_sub_slots_data) > 0:
@@ -510,7 +624,7 @@ class WeightProofHandler:
         log.debug(f"slot end vdf end height {curr.height} slots {len(sub_slots_data)} ")
         return sub_slots_data, curr.height
 
-    def handle_block_vdfs(self, curr: HeaderBlock, blocks: Dict[bytes32, BlockRecord]):
+    def handle_block_vdfs(self, curr: HeaderBlock, blocks: Dict[bytes32, BlockRecord], block_cache: BlockCache):
         cc_sp_proof = None
         icc_ip_proof = None
         cc_sp_info = None
@@ -524,14 +638,16 @@ class WeightProofHandler:
             assert curr.reward_chain_block.challenge_chain_sp_vdf
             cc_sp_vdf_info = curr.reward_chain_block.challenge_chain_sp_vdf
             if not curr.challenge_chain_sp_proof.normalized_to_identity:
+                # sp_total_iters would compute the sp iters a second time
+                sp_iters = block_record.sp_iters(self.constants)
                 (_, _, _, _, cc_vdf_iters, _,) = get_signage_point_vdf_info(
                     self.constants,
                     curr.finished_sub_slots,
                     block_record.overflow,
                     None if curr.height == 0 else blocks[curr.prev_header_hash],
-                    BlockCache(blocks),
-                    block_record.sp_total_iters(self.constants),
-                    block_record.sp_iters(self.constants),
+                    block_cache,
+                    uint128(block_record.sp_sub_slot_total_iters(self.constants) + sp_iters),
+                    sp_iters,
                 )
                 cc_sp_vdf_info = VDFInfo(
                     curr.reward_chain_block.challenge_chain_sp_vdf.challenge,
@@ -576,7 +692,10 @@ class WeightProofHandler:
             log.error("failed weight proof sub epoch sample validation")
             return False, uint32(0)
 
-        if not _validate_sub_epoch_segments(self.constants, rng, wp_segment_bytes, summary_bytes):
+        segments_validated, vdfs_to_validate = _validate_sub_epoch_segments(
+            self.constants, rng, wp_segment_bytes, summary_bytes
+        )
+        if not segments_validated or not _validate_vdf_batch(self.constants, vdfs_to_validate):
             return False, uint32(0)
         log.info("validate weight proof recent blocks")
         success, _ = validate_recent_blocks(self.constants, wp_recent_chain_bytes, summary_bytes)
@@ -613,44 +732,45 @@ class WeightProofHandler:
 
         fork_point, ses_fork_idx = self.get_fork_point(summaries)
         # timing reference: 1 second
-        # TODO: Consider implementing an async polling closer for the executor.
-        with ProcessPoolExecutor(
-            max_workers=self._num_processes,
-            mp_context=self.multiprocessing_context,
-            initializer=setproctitle,
-            initargs=(f"{getproctitle()}_worker",),
-        ) as executor:
-            # The shutdown file manager must be inside of the executor manager so that
-            # we request the workers close prior to waiting for them to close.
-            with _create_shutdown_file() as shutdown_file:
-                task: asyncio.Task = asyncio.create_task(
-                    validate_weight_proof_inner(
-                        self.constants,
-                        executor,
-                        shutdown_file.name,
-                        self._num_processes,
-                        weight_proof,
-                        summaries,
-                        sub_epoch_weight_list,
-                        False,
-                        ses_fork_idx,
-                    )
+        executor = self._get_executor()
+        # The shutdown file is created per proof, removing it stops the workers still busy with this proof
+        # without tearing down the shared executor.
+        with _create_shutdown_file() as shutdown_file:
+            task: asyncio.Task = asyncio.create_task(
+                validate_weight_proof_inner(
+                    self.constants,
+                    executor,
+                    shutdown_file.name,
+                    self._num_processes,
+                    weight_proof,
+                    summaries,
+                    sub_epoch_weight_list,
+                    False,
+                    ses_fork_idx,
                 )
+            )
+            try:
                 valid, _ = await task
+            except BrokenProcessPool:
+                # a worker died (e.g. killed for using too much memory), a broken pool fails every later task,
+                # replace it so the next proofs can be validated again
+                log.exception("weight proof validation process pool is broken, recreating it")
+                self._drop_broken_executor(executor)
+                return False, uint32(0), []
         return valid, fork_point, summaries
 
     def get_fork_point(self, received_summaries: List[SubEpochSummary]) -> Tuple[uint32, int]:
         # returns the fork height and ses index
         # iterate through sub epoch summaries to find fork point
         fork_point_index = 0
-        ses_heights = self.blockchain.get_ses_heights()
-        for idx, summary_height in enumerate(ses_heights):
+        ses_heights = self._get_ses_heights()
+        # the last wp summary is never compared, if the local chain is longer or equal to the wp chain we stop there
+        compared_heights = ses_heights[: max(0, len(received_summaries) - 1)]
+        for idx, (summary_height, received_ses) in enumerate(zip(compared_heights, received_summaries)):
             log.debug(f"check summary {idx} height {summary_height}")
-            local_ses = self.blockchain.get_ses(summary_height)
-            if idx == len(received_summaries) - 1:
-                # end of wp summaries, local chain is longer or equal to wp chain
-                break
-            if local_ses is None or local_ses.get_hash() != received_summaries[idx].get_hash():
+            local_ses = self._get_ses(summary_height)
+            # equal summaries serialize, and therefore hash, the same, comparing the fields skips hashing both
+            if local_ses is None or local_ses != received_ses:
                 break
             fork_point_index = idx
 
@@ -665,19 +785,18 @@ class WeightProofHandler:
 def _get_weights_for_sampling(
     rng: random.Random, total_weight: uint128, recent_chain: List[HeaderBlock]
 ) -> Optional[List[uint128]]:
-    weight_to_check = []
     last_l_weight = recent_chain[-1].reward_chain_block.weight - recent_chain[0].reward_chain_block.weight
     delta = last_l_weight / total_weight
     prob_of_adv_succeeding = 1 - math.log(WeightProofHandler.C, delta)
     if prob_of_adv_succeeding <= 0:
         return None
     queries = -WeightProofHandler.LAMBDA_L * math.log(2, prob_of_adv_succeeding)
-    for i in range(int(queries) + 1):
-        u = rng.random()
-        q = 1 - delta**u
-        # todo check division and type conversions
-        weight = q * float(total_weight)
-        weight_to_check.append(uint128(int(weight)))
+    total_weight_float = float(total_weight)
+    # the draws have to be taken from rng in this order, proof creation and validation must agree on the samples
+    # todo check division and type conversions
+    weight_to_check = [
+        uint128(int((1 - delta ** rng.random()) * total_weight_float)) for _ in range(int(queries) + 1)
+    ]
     weight_to_check.sort()
     return weight_to_check
 
@@ -692,22 +811,14 @@ def _sample_sub_epoch(
     """
     if weight_to_check is None:
         return True
-    if weight_to_check[-1] < start_of_epoch_weight:
+    # first weight strictly above the start of the sub epoch, the sub epoch is sampled if it is also below the end
+    idx = bisect_right(weight_to_check, start_of_epoch_weight)
+    if idx == len(weight_to_check) or weight_to_check[idx] >= end_of_epoch_weight:
         return False
-    if weight_to_check[0] > end_of_epoch_weight:
-        return False
-    choose = False
-    for weight in weight_to_check:
-        if weight > end_of_epoch_weight:
-            return False
-        if start_of_epoch_weight < weight < end_of_epoch_weight:
-            log.debug(f"start weight: {start_of_epoch_weight}")
-            log.debug(f"weight to check {weight}")
-            log.debug(f"end weight: {end_of_epoch_weight}")
-            choose = True
-            break
-
-    return choose
+    log.debug(f"start weight: {start_of_epoch_weight}")
+    log.debug(f"weight to check {weight_to_check[idx]}")
+    log.debug(f"end weight: {end_of_epoch_weight}")
+    return True
 
 
 # wp creation methods
@@ -728,22 +839,24 @@ async def _challenge_block_vdfs(
     header_block: HeaderBlock,
     block_rec: BlockRecord,
     sub_blocks: Dict[bytes32, BlockRecord],
+    block_cache: BlockCache,
 ):
-    (_, _, _, _, cc_vdf_iters, _,) = get_signage_point_vdf_info(
-        constants,
-        header_block.finished_sub_slots,
-        block_rec.overflow,
-        None if header_block.height == 0 else sub_blocks[header_block.prev_header_hash],
-        BlockCache(sub_blocks),
-        block_rec.sp_total_iters(constants),
-        block_rec.sp_iters(constants),
-    )
-
     cc_sp_info = None
     if header_block.reward_chain_block.challenge_chain_sp_vdf:
         cc_sp_info = header_block.reward_chain_block.challenge_chain_sp_vdf
         assert header_block.challenge_chain_sp_proof
+        # the sp vdf iterations are only needed to rebuild the vdf info of a proof that is not normalized
         if not header_block.challenge_chain_sp_proof.normalized_to_identity:
+            sp_iters = block_rec.sp_iters(constants)
+            (_, _, _, _, cc_vdf_iters, _,) = get_signage_point_vdf_info(
+                constants,
+                header_block.finished_sub_slots,
+                block_rec.overflow,
+                None if header_block.height == 0 else sub_blocks[header_block.prev_header_hash],
+                block_cache,
+                uint128(block_rec.sp_sub_slot_total_iters(constants) + sp_iters),
+                sp_iters,
+            )
             cc_sp_info = VDFInfo(
                 header_block.reward_chain_block.challenge_chain_sp_vdf.challenge,
                 cc_vdf_iters,
@@ -831,24 +944,8 @@ def handle_end_of_slot(
 
 
 def compress_segments(full_segment_index, segments: List[SubEpochChallengeSegment]) -> List[SubEpochChallengeSegment]:
-    compressed_segments = []
-    compressed_segments.append(segments[0])
-    for idx, segment in enumerate(segments[1:]):
-        if idx != full_segment_index:
-            # remove all redundant values
-            segment = compress_segment(segment)
-        compressed_segments.append(segment)
-    return compressed_segments
-
-
-def compress_segment(segment: SubEpochChallengeSegment) -> SubEpochChallengeSegment:
-    # find challenge slot
-    comp_seg = SubEpochChallengeSegment(segment.sub_epoch_n, [], segment.rc_slot_end_info)
-    for slot in segment.sub_slots:
-        comp_seg.sub_slots.append(slot)
-        if slot.is_challenge():
-            break
-    return segment
+    # segments are sent whole, nothing is stripped from the ones besides full_segment_index
+    return segments
 
 
 # wp validation methods
@@ -920,7 +1017,7 @@ def _map_sub_epoch_summaries(
 
         # add to dict
         summaries.append(ses)
-        ses_hash = std_hash(ses)
+        ses_hash = ses.get_hash()
     # add last sub epoch weight
     sub_epoch_weight_list.append(uint128(total_weight + curr_difficulty))
     return summaries, total_weight, sub_epoch_weight_list
@@ -939,54 +1036,102 @@ def _validate_summaries_weight(constants: ConsensusConstants, sub_epoch_data_wei
     return curr.reward_chain_block.weight == sub_epoch_data_weight
 
 
+def _sample_segment_indexes(
+    rng: random.Random, segments_by_sub_epoch: Dict[int, List[SubEpochChallengeSegment]]
+) -> Dict[int, int]:
+    # one draw per sub epoch in order, so the same segments are sampled however the sub epochs are split up later
+    return {sub_epoch_n: rng.randrange(len(segments)) for sub_epoch_n, segments in segments_by_sub_epoch.items()}
+
+
 def _validate_sub_epoch_segments(
     constants: ConsensusConstants,
     rng: random.Random,
     weight_proof_bytes: bytes,
     summaries_bytes: List[bytes],
     validate_from: int = 0,
-):
-    summaries = summaries_from_bytes(summaries_bytes)
+    shutdown_file_path: Optional[pathlib.Path] = None,
+) -> Tuple[bool, List[Tuple[bytes, bytes, bytes]]]:
     sub_epoch_segments: SubEpochSegments = SubEpochSegments.from_bytes(weight_proof_bytes)
-    rc_sub_slot_hash = constants.GENESIS_CHALLENGE
-    total_blocks, total_ip_iters = 0, 0
-    total_slot_iters, total_slots = 0, 0
-    total_ip_iters = 0
-    prev_ses: Optional[SubEpochSummary] = None
     segments_by_sub_epoch = map_segments_by_sub_epoch(sub_epoch_segments.challenge_segments)
-    curr_ssi = constants.SUB_SLOT_ITERS_STARTING
-    vdfs_to_validate = []
+    return _validate_sub_epochs(
+        constants,
+        segments_by_sub_epoch,
+        _sample_segment_indexes(rng, segments_by_sub_epoch),
+        summaries_from_bytes(summaries_bytes),
+        validate_from,
+        shutdown_file_path,
+    )
+
+
+def _validate_sub_epoch_segments_batch(
+    constants: ConsensusConstants,
+    segments_bytes: bytes,
+    sampled_seg_indexes: Dict[int, int],
+    summaries_bytes: List[bytes],
+    validate_from: int = 0,
+    shutdown_file_path: Optional[pathlib.Path] = None,
+) -> Tuple[bool, List[Tuple[bytes, bytes, bytes]]]:
+    # runs in a worker process on a subset of the sub epochs, the vdfs are returned serialized so they can go
+    # straight to _validate_vdf_batch
+    sub_epoch_segments: SubEpochSegments = SubEpochSegments.from_bytes(segments_bytes)
+    return _validate_sub_epochs(
+        constants,
+        map_segments_by_sub_epoch(sub_epoch_segments.challenge_segments),
+        sampled_seg_indexes,
+        summaries_from_bytes(summaries_bytes),
+        validate_from,
+        shutdown_file_path,
+    )
+
+
+def _validate_sub_epochs(
+    constants: ConsensusConstants,
+    segments_by_sub_epoch: Dict[int, List[SubEpochChallengeSegment]],
+    sampled_seg_indexes: Dict[int, int],
+    summaries: List[SubEpochSummary],
+    validate_from: int = 0,
+    shutdown_file_path: Optional[pathlib.Path] = None,
+) -> Tuple[bool, List[Tuple[bytes, bytes, bytes]]]:
+    # every sub epoch only depends on the summaries, so any subset of them can be validated on its own
+    prev_ses: Optional[SubEpochSummary] = None
+    vdfs_to_validate: List[Tuple[bytes, bytes, bytes]] = []
+    diff_ssi_by_sub_epoch = _get_diff_ssi_by_sub_epoch(constants, summaries)
     for sub_epoch_n, segments in segments_by_sub_epoch.items():
-        prev_ssi = curr_ssi
-        curr_difficulty, curr_ssi = _get_curr_diff_ssi(constants, sub_epoch_n, summaries)
+        curr_difficulty, curr_ssi = diff_ssi_by_sub_epoch[sub_epoch_n]
         log.debug(f"validate sub epoch {sub_epoch_n}")
         # recreate RewardChainSubSlot for next ses rc_hash
-        sampled_seg_index = rng.choice(range(len(segments)))
+        sampled_seg_index = sampled_seg_indexes[sub_epoch_n]
+        rc_sub_slot_hash = constants.GENESIS_CHALLENGE
         if sub_epoch_n > 0:
             rc_sub_slot = __get_rc_sub_slot(constants, segments[0], summaries, curr_ssi)
             prev_ses = summaries[sub_epoch_n - 1]
             rc_sub_slot_hash = rc_sub_slot.get_hash()
         if not summaries[sub_epoch_n].reward_chain_hash == rc_sub_slot_hash:
             log.error(f"failed reward_chain_hash validation sub_epoch {sub_epoch_n}")
-            return False
+            return False, []
 
         # skip validation up to fork height
         if sub_epoch_n < validate_from:
             continue
+        if curr_difficulty is None:
+            log.error(f"no difficulty in the epoch summary before sub_epoch {sub_epoch_n}")
+            return False, []
 
         for idx, segment in enumerate(segments):
-            valid_segment, ip_iters, slot_iters, slots, vdf_list = _validate_segment(
-                constants, segment, curr_ssi, prev_ssi, curr_difficulty, prev_ses, idx == 0, sampled_seg_index == idx
+            valid_segment, vdf_list = _validate_segment(
+                constants, segment, curr_ssi, curr_difficulty, prev_ses, idx == 0, sampled_seg_index == idx
+            )
+            vdfs_to_validate.extend(
+                (bytes(vdf_proof), bytes(classgroup), bytes(vdf_info)) for vdf_proof, classgroup, vdf_info in vdf_list
             )
-            vdfs_to_validate.extend(vdf_list)
             if not valid_segment:
                 log.error(f"failed to validate sub_epoch {segment.sub_epoch_n} segment {idx} slots")
-                return False
+                return False, []
             prev_ses = None
-            total_blocks += 1
-            total_slot_iters += slot_iters
-            total_slots += slots
-            total_ip_iters += ip_iters
+
+        if shutdown_file_path is not None and not shutdown_file_path.is_file():
+            log.info(f"cancelling sub epoch {sub_epoch_n} validation, shutdown requested")
+            return False, []
     return True, vdfs_to_validate
 
 
@@ -994,36 +1139,55 @@ def _validate_segment(
     constants: ConsensusConstants,
     segment: SubEpochChallengeSegment,
     curr_ssi: uint64,
-    prev_ssi: uint64,
     curr_difficulty: uint64,
     ses: Optional[SubEpochSummary],
     first_segment_in_se: bool,
     sampled: bool,
-) -> Tuple[bool, int, int, int, List[Tuple[VDFProof, ClassgroupElement, VDFInfo]]]:
-    ip_iters, slot_iters, slots = 0, 0, 0
+) -> Tuple[bool, List[Tuple[VDFProof, ClassgroupElement, VDFInfo]]]:
+    if not sampled:
+        # nothing is validated in segments that were not sampled
+        return True, []
+
     after_challenge = False
     to_validate = []
+    blue_boxed = _blue_boxed_slot_ends(segment.sub_slots)
+    # tracked on the way forward, instead of searching back for it from the challenge block
+    last_slot_end: Optional[SubSlotData] = None
     for idx, sub_slot_data in enumerate(segment.sub_slots):
-        if sampled and sub_slot_data.is_challenge():
+        if sub_slot_data.is_challenge():
             after_challenge = True
-            required_iters = __validate_pospace(constants, segment, idx, curr_difficulty, ses, first_segment_in_se)
+            # shared by the proof of space and the vdf checks of the challenge block
+            is_overflow = sub_slot_data.signage_point_index is not None and is_overflow_block(
+                constants, sub_slot_data.signage_point_index
+            )
+            required_iters = __validate_pospace(
+                constants, segment, idx, curr_difficulty, ses, first_segment_in_se, is_overflow, last_slot_end
+            )
             if required_iters is None:
-                return False, uint64(0), uint64(0), uint64(0), []
+                return False, []
             assert sub_slot_data.signage_point_index is not None
-            ip_iters = ip_iters + calculate_ip_iters(
-                constants, curr_ssi, sub_slot_data.signage_point_index, required_iters
-            )
-            vdf_list = _get_challenge_block_vdfs(constants, idx, segment.sub_slots, curr_ssi)
-            to_validate.extend(vdf_list)
-        elif sampled and after_challenge:
-            validated, vdf_list = _validate_sub_slot_data(constants, idx, segment.sub_slots, curr_ssi)
-            if not validated:
-                log.error(f"failed to validate sub slot data {idx} vdfs")
-                return False, uint64(0), uint64(0), uint64(0), []
+            # raises if the sp index or the required iters don't fit in the slot
+            calculate_ip_iters(constants, curr_ssi, sub_slot_data.signage_point_index, required_iters)
+            vdf_list = _get_challenge_block_vdfs(constants, idx, segment.sub_slots, curr_ssi, is_overflow)
             to_validate.extend(vdf_list)
-        slot_iters = slot_iters + curr_ssi
-        slots = slots + uint64(1)
-    return True, ip_iters, slot_iters, slots, to_validate
+        elif after_challenge:
+            to_validate.extend(_get_sub_slot_data_vdfs(constants, idx, segment.sub_slots, curr_ssi, blue_boxed[idx]))
+        if sub_slot_data.is_end_of_slot():
+            last_slot_end = sub_slot_data
+    return True, to_validate
+
+
+def _blue_boxed_slot_ends(sub_slots: List[SubSlotData]) -> List[bool]:
+    # for every sub slot, whether the first end of slot from it on (the last sub slot excluded) is blue boxed.
+    # One backward pass instead of scanning forward from each sub slot
+    blue_boxed = [False] * len(sub_slots)
+    next_blue_boxed = False
+    for idx in reversed(range(len(sub_slots) - 1)):
+        curr_slot = sub_slots[idx]
+        if curr_slot.is_end_of_slot():
+            next_blue_boxed = curr_slot.cc_slot_end is not None and curr_slot.cc_slot_end.normalized_to_identity
+        blue_boxed[idx] = next_blue_boxed
+    return blue_boxed
 
 
 def _get_challenge_block_vdfs(
@@ -1031,6 +1195,7 @@ def _get_challenge_block_vdfs(
     sub_slot_idx: int,
     sub_slots: List[SubSlotData],
     ssi: uint64,
+    is_overflow: bool,
 ) -> List[Tuple[VDFProof, ClassgroupElement, VDFInfo]]:
     to_validate = []
     sub_slot_data = sub_slots[sub_slot_idx]
@@ -1038,7 +1203,6 @@ def _get_challenge_block_vdfs(
         assert sub_slot_data.signage_point_index
         sp_input = ClassgroupElement.get_default_element()
         if not sub_slot_data.cc_signage_point.normalized_to_identity and sub_slot_idx >= 1:
-            is_overflow = is_overflow_block(constants, sub_slot_data.signage_point_index)
             prev_ssd = sub_slots[sub_slot_idx - 1]
             sp_input = sub_slot_data_vdf_input(
                 constants, sub_slot_data, sub_slot_idx, sub_slots, is_overflow, prev_ssd.is_end_of_slot(), ssi
@@ -1065,12 +1229,13 @@ def _get_challenge_block_vdfs(
     return to_validate
 
 
-def _validate_sub_slot_data(
+def _get_sub_slot_data_vdfs(
     constants: ConsensusConstants,
     sub_slot_idx: int,
     sub_slots: List[SubSlotData],
     ssi: uint64,
-) -> Tuple[bool, List[Tuple[VDFProof, ClassgroupElement, VDFInfo]]]:
+    blue_boxed_slot_end: bool,
+) -> List[Tuple[VDFProof, ClassgroupElement, VDFInfo]]:
 
     sub_slot_data = sub_slots[sub_slot_idx]
     assert sub_slot_idx > 0
@@ -1090,23 +1255,12 @@ def _validate_sub_slot_data(
         if (not prev_ssd.is_end_of_slot()) and (not sub_slot_data.cc_slot_end.normalized_to_identity):
             assert prev_ssd.cc_ip_vdf_info
             input = prev_ssd.cc_ip_vdf_info.output
-        if not sub_slot_data.cc_slot_end.is_valid(constants, input, sub_slot_data.cc_slot_end_info):
-            log.error(f"failed cc slot end validation  {sub_slot_data.cc_slot_end_info}")
-            return False, []
+        to_validate.append((sub_slot_data.cc_slot_end, input, sub_slot_data.cc_slot_end_info))
     else:
-        # find end of slot
-        idx = sub_slot_idx
-        while idx < len(sub_slots) - 1:
-            curr_slot = sub_slots[idx]
-            if curr_slot.is_end_of_slot():
-                # dont validate intermediate vdfs if slot is blue boxed
-                assert curr_slot.cc_slot_end
-                if curr_slot.cc_slot_end.normalized_to_identity is True:
-                    log.debug(f"skip intermediate vdfs slot {sub_slot_idx}")
-                    return True, to_validate
-                else:
-                    break
-            idx += 1
+        # dont validate intermediate vdfs if slot is blue boxed
+        if blue_boxed_slot_end:
+            log.debug(f"skip intermediate vdfs slot {sub_slot_idx}")
+            return to_validate
         if sub_slot_data.icc_infusion_point is not None and sub_slot_data.icc_ip_vdf_info is not None:
             input = ClassgroupElement.get_default_element()
             if not prev_ssd.is_challenge() and prev_ssd.icc_ip_vdf_info is not None:
@@ -1138,7 +1292,7 @@ def _validate_sub_slot_data(
             )
         to_validate.append((sub_slot_data.cc_infusion_point, input, cc_ip_vdf_info))
 
-    return True, to_validate
+    return to_validate
 
 
 def sub_slot_data_vdf_input(
@@ -1151,21 +1305,25 @@ def sub_slot_data_vdf_input(
     ssi: uint64,
 ) -> ClassgroupElement:
     cc_input = ClassgroupElement.get_default_element()
+    if new_sub_slot and (
+        not is_overflow or sub_slot_idx < 2 or sub_slots[sub_slot_idx - 2].cc_slot_end_info is not None
+    ):
+        # the sp is at the start of a slot, there is nothing to search for
+        return cc_input
+
     sp_total_iters = get_sp_total_iters(constants, is_overflow, ssi, sub_slot_data)
     ssd: Optional[SubSlotData] = None
     if is_overflow and new_sub_slot:
-        if sub_slot_idx >= 2:
-            if sub_slots[sub_slot_idx - 2].cc_slot_end_info is None:
-                for ssd_idx in reversed(range(0, sub_slot_idx - 1)):
-                    ssd = sub_slots[ssd_idx]
-                    if ssd.cc_slot_end_info is not None:
-                        ssd = sub_slots[ssd_idx + 1]
-                        break
-                    if not (ssd.total_iters > sp_total_iters):
-                        break
-                if ssd and ssd.cc_ip_vdf_info is not None:
-                    if ssd.total_iters < sp_total_iters:
-                        cc_input = ssd.cc_ip_vdf_info.output
+        for ssd_idx in reversed(range(0, sub_slot_idx - 1)):
+            ssd = sub_slots[ssd_idx]
+            if ssd.cc_slot_end_info is not None:
+                ssd = sub_slots[ssd_idx + 1]
+                break
+            if not (ssd.total_iters > sp_total_iters):
+                break
+        if ssd and ssd.cc_ip_vdf_info is not None:
+            if ssd.total_iters < sp_total_iters:
+                cc_input = ssd.cc_ip_vdf_info.output
         return cc_input
 
     elif not is_overflow and not new_sub_slot:
@@ -1210,14 +1368,21 @@ def validate_recent_blocks(
     sub_blocks = BlockCache({})
     first_ses_idx = _get_ses_idx(recent_chain.recent_chain_data)
     ses_idx = len(summaries) - len(first_ses_idx)
-    ssi: uint64 = constants.SUB_SLOT_ITERS_STARTING
-    diff: uint64 = constants.DIFFICULTY_STARTING
     last_blocks_to_validate = 100  # todo remove cap after benchmarks
-    for summary in summaries[:ses_idx]:
-        if summary.new_sub_slot_iters is not None:
-            ssi = summary.new_sub_slot_iters
-        if summary.new_difficulty is not None:
-            diff = summary.new_difficulty
+    # the latest summaries before the recent chain that set them hold the current ssi and difficulty, walk back
+    # from there without copying the summaries and stop as soon as both are known
+    new_ssi: Optional[uint64] = None
+    new_diff: Optional[uint64] = None
+    for summary_idx in reversed(range(len(summaries))[:ses_idx]):
+        summary = summaries[summary_idx]
+        if new_ssi is None:
+            new_ssi = summary.new_sub_slot_iters
+        if new_diff is None:
+            new_diff = summary.new_difficulty
+        if new_ssi is not None and new_diff is not None:
+            break
+    ssi: uint64 = constants.SUB_SLOT_ITERS_STARTING if new_ssi is None else new_ssi
+    diff: uint64 = constants.DIFFICULTY_STARTING if new_diff is None else new_diff
 
     ses_blocks, sub_slots, transaction_blocks = 0, 0, 0
     challenge, prev_challenge = recent_chain.recent_chain_data[0].reward_chain_block.pos_ss_cc_challenge_hash, None
@@ -1304,7 +1469,7 @@ def _validate_pospace_recent_chain(
         # Edge case of first sp (start of slot), where sp_iters == 0
         cc_sp_hash: bytes32 = challenge
     else:
-        cc_sp_hash = block.reward_chain_block.challenge_chain_sp_vdf.output.get_hash()
+        cc_sp_hash = _classgroup_hash(block.reward_chain_block.challenge_chain_sp_vdf.output)
     assert cc_sp_hash is not None
     q_str = block.reward_chain_block.proof_of_space.verify_and_get_quality_string(
         constants,
@@ -1331,15 +1496,17 @@ def __validate_pospace(
     curr_diff: uint64,
     ses: Optional[SubEpochSummary],
     first_in_sub_epoch: bool,
+    is_overflow: bool,
+    last_slot_end: Optional[SubSlotData],
 ) -> Optional[uint64]:
     if first_in_sub_epoch and segment.sub_epoch_n == 0 and idx == 0:
         cc_sub_slot_hash = constants.GENESIS_CHALLENGE
     else:
-        cc_sub_slot_hash = __get_cc_sub_slot(segment.sub_slots, idx, ses).get_hash()
+        cc_sub_slot_hash = __get_cc_sub_slot_hash(last_slot_end, ses)
 
     sub_slot_data: SubSlotData = segment.sub_slots[idx]
 
-    if sub_slot_data.signage_point_index and is_overflow_block(constants, sub_slot_data.signage_point_index):
+    if is_overflow:
         curr_slot = segment.sub_slots[idx - 1]
         assert curr_slot.cc_slot_end_info
         challenge = curr_slot.cc_slot_end_info.challenge
@@ -1349,7 +1516,7 @@ def __validate_pospace(
     if sub_slot_data.cc_sp_vdf_info is None:
         cc_sp_hash = cc_sub_slot_hash
     else:
-        cc_sp_hash = sub_slot_data.cc_sp_vdf_info.output.get_hash()
+        cc_sp_hash = _classgroup_hash(sub_slot_data.cc_sp_vdf_info.output)
 
     # validate proof of space
     assert sub_slot_data.proof_of_space is not None
@@ -1377,38 +1544,25 @@ def __get_rc_sub_slot(
     curr_ssi: uint64,
 ) -> RewardChainSubSlot:
 
-    ses = summaries[uint32(segment.sub_epoch_n - 1)]
+    slots = segment.sub_slots
     # find first challenge in sub epoch
     first_idx = None
-    first = None
-    for idx, curr in enumerate(segment.sub_slots):
+    for idx, curr in enumerate(slots):
         if curr.cc_slot_end is None:
             first_idx = idx
-            first = curr
             break
 
     assert first_idx
-    idx = first_idx
-    slots = segment.sub_slots
+    first = slots[first_idx]
+    assert first.signage_point_index is not None
 
     # number of slots to look for
     slots_n = 1
-    assert first
-    assert first.signage_point_index is not None
     if is_overflow_block(constants, first.signage_point_index):
-        if idx >= 2 and slots[idx - 2].cc_slot_end is None:
+        if first_idx >= 2 and slots[first_idx - 2].cc_slot_end is None:
             slots_n = 2
 
-    new_diff = None if ses is None else ses.new_difficulty
-    new_ssi = None if ses is None else ses.new_sub_slot_iters
-    ses_hash: Optional[bytes32] = None if ses is None else ses.get_hash()
-    overflow = is_overflow_block(constants, first.signage_point_index)
-    if overflow:
-        if idx >= 2 and slots[idx - 2].cc_slot_end is not None and slots[idx - 1].cc_slot_end is not None:
-            ses_hash = None
-            new_ssi = None
-            new_diff = None
-
+    idx = first_idx
     sub_slot = slots[idx]
     while True:
         if sub_slot.cc_slot_end:
@@ -1419,15 +1573,14 @@ def __get_rc_sub_slot(
         sub_slot = slots[idx]
 
     icc_sub_slot_hash: Optional[bytes32] = None
-    assert sub_slot is not None
     assert sub_slot.cc_slot_end_info is not None
 
     assert segment.rc_slot_end_info is not None
     if idx != 0:
         # this is not the first slot, ses details should not be included
-        ses_hash = None
-        new_ssi = None
-        new_diff = None
+        ses_hash: Optional[bytes32] = None
+        new_ssi: Optional[uint64] = None
+        new_diff: Optional[uint64] = None
         cc_vdf_info = VDFInfo(sub_slot.cc_slot_end_info.challenge, curr_ssi, sub_slot.cc_slot_end_info.output)
         if sub_slot.icc_slot_end_info is not None:
             icc_slot_end_info = VDFInfo(
@@ -1435,33 +1588,25 @@ def __get_rc_sub_slot(
             )
             icc_sub_slot_hash = icc_slot_end_info.get_hash()
     else:
+        # the ses is only looked up and hashed for the slot that includes it
+        ses = summaries[segment.sub_epoch_n - 1]
+        ses_hash = ses.get_hash()
+        new_ssi = ses.new_sub_slot_iters
+        new_diff = ses.new_difficulty
         cc_vdf_info = sub_slot.cc_slot_end_info
         if sub_slot.icc_slot_end_info is not None:
             icc_sub_slot_hash = sub_slot.icc_slot_end_info.get_hash()
-    cc_sub_slot = ChallengeChainSubSlot(
-        cc_vdf_info,
-        icc_sub_slot_hash,
-        ses_hash,
-        new_ssi,
-        new_diff,
-    )
-
     rc_sub_slot = RewardChainSubSlot(
         segment.rc_slot_end_info,
-        cc_sub_slot.get_hash(),
+        _cc_sub_slot_hash(cc_vdf_info, icc_sub_slot_hash, ses_hash, new_ssi, new_diff),
         icc_sub_slot_hash,
         constants.MIN_BLOCKS_PER_CHALLENGE_BLOCK,
     )
     return rc_sub_slot
 
 
-def __get_cc_sub_slot(sub_slots: List[SubSlotData], idx, ses: Optional[SubEpochSummary]) -> ChallengeChainSubSlot:
-    sub_slot: Optional[SubSlotData] = None
-    for i in reversed(range(0, idx)):
-        sub_slot = sub_slots[i]
-        if sub_slot.cc_slot_end_info is not None:
-            break
-
+def __get_cc_sub_slot_hash(sub_slot: Optional[SubSlotData], ses: Optional[SubEpochSummary]) -> bytes32:
+    # sub_slot is the last end of slot before the block
     assert sub_slot is not None
     assert sub_slot.cc_slot_end_info is not None
 
@@ -1469,7 +1614,7 @@ def __get_cc_sub_slot(sub_slots: List[SubSlotData], idx, ses: Optional[SubEpochS
     icc_vdf_hash: Optional[bytes32] = None
     if icc_vdf is not None:
         icc_vdf_hash = icc_vdf.get_hash()
-    cc_sub_slot = ChallengeChainSubSlot(
+    return _cc_sub_slot_hash(
         sub_slot.cc_slot_end_info,
         icc_vdf_hash,
         None if ses is None else ses.get_hash(),
@@ -1477,54 +1622,73 @@ def __get_cc_sub_slot(sub_slots: List[SubSlotData], idx, ses: Optional[SubEpochS
         None if ses is None else ses.new_difficulty,
     )
 
-    return cc_sub_slot
 
+# workers are kept between validations, the same sub slots come up again when overlapping proofs are validated
+@lru_cache(maxsize=1000)
+def _cc_sub_slot_hash(
+    cc_vdf_info: VDFInfo,
+    icc_sub_slot_hash: Optional[bytes32],
+    ses_hash: Optional[bytes32],
+    new_ssi: Optional[uint64],
+    new_diff: Optional[uint64],
+) -> bytes32:
+    return ChallengeChainSubSlot(cc_vdf_info, icc_sub_slot_hash, ses_hash, new_ssi, new_diff).get_hash()
+
+
+# overflow blocks and overlapping proofs refer to the same signage point outputs again
+@lru_cache(maxsize=4096)
+def _classgroup_hash(output: ClassgroupElement) -> bytes32:
+    return output.get_hash()
 
-def _get_curr_diff_ssi(constants: ConsensusConstants, idx, summaries):
-    curr_difficulty = constants.DIFFICULTY_STARTING
+
+def _get_diff_ssi_by_sub_epoch(
+    constants: ConsensusConstants, summaries: List[SubEpochSummary]
+) -> List[Tuple[Optional[uint64], uint64]]:
+    # the difficulty and sub slot iters of every sub epoch, set by the last epoch change in the summaries before it.
+    # The difficulty is None if a malformed summary changed the sub slot iters without it, that is only rejected
+    # for the sub epochs that get validated.
+    curr_difficulty: Optional[uint64] = constants.DIFFICULTY_STARTING
     curr_ssi = constants.SUB_SLOT_ITERS_STARTING
-    for ses in reversed(summaries[0:idx]):
+    diff_ssi = [(curr_difficulty, curr_ssi)]
+    for ses in summaries[:-1]:
         if ses.new_sub_slot_iters is not None:
             curr_ssi = ses.new_sub_slot_iters
             curr_difficulty = ses.new_difficulty
-            break
-
-    return curr_difficulty, curr_ssi
+        diff_ssi.append((curr_difficulty, curr_ssi))
+    return diff_ssi
 
 
 def vars_to_bytes(summaries: List[SubEpochSummary], weight_proof: WeightProof):
     wp_recent_chain_bytes = bytes(RecentChainData(weight_proof.recent_chain_data))
     wp_segment_bytes = bytes(SubEpochSegments(weight_proof.sub_epoch_segments))
-    summary_bytes = []
-    for summary in summaries:
-        summary_bytes.append(bytes(summary))
+    summary_bytes = [bytes(summary) for summary in summaries]
     return summary_bytes, wp_segment_bytes, wp_recent_chain_bytes
 
 
+# the executor workers outlive a single validation and consecutive proofs share nearly all of their summaries, so
+# each summary is only parsed once per process. Summaries are immutable, the parsed objects can be shared
+@lru_cache(maxsize=8192)
+def _summary_from_bytes(summary_bytes: bytes) -> SubEpochSummary:
+    return SubEpochSummary.from_bytes(summary_bytes)
+
+
 def summaries_from_bytes(summaries_bytes: List[bytes]) -> List[SubEpochSummary]:
-    summaries = []
-    for summary in summaries_bytes:
-        summaries.append(SubEpochSummary.from_bytes(summary))
-    return summaries
+    return [_summary_from_bytes(summary) for summary in summaries_bytes]
 
 
 def _get_last_ses_hash(
     constants: ConsensusConstants, recent_reward_chain: List[HeaderBlock]
 ) -> Tuple[Optional[bytes32], uint32]:
-    for idx, block in enumerate(reversed(recent_reward_chain)):
-        if (block.reward_chain_block.height % constants.SUB_EPOCH_BLOCKS) == 0:
-            idx = len(recent_reward_chain) - 1 - idx  # reverse
-            # find first block after sub slot end
-            while idx < len(recent_reward_chain):
-                curr = recent_reward_chain[idx]
-                if len(curr.finished_sub_slots) > 0:
-                    for slot in curr.finished_sub_slots:
-                        if slot.challenge_chain.subepoch_summary_hash is not None:
-                            return (
-                                slot.challenge_chain.subepoch_summary_hash,
-                                curr.reward_chain_block.height,
-                            )
-                idx += 1
+    # walking backwards, remember the earliest sub epoch summary seen so far, that is the first one found by a forward
+    # scan from the current block, and return it once a block at the start of a sub epoch is reached
+    ses: Optional[Tuple[bytes32, uint32]] = None
+    for block in reversed(recent_reward_chain):
+        for slot in block.finished_sub_slots:
+            if slot.challenge_chain.subepoch_summary_hash is not None:
+                ses = slot.challenge_chain.subepoch_summary_hash, block.reward_chain_block.height
+                break
+        if ses is not None and (block.reward_chain_block.height % constants.SUB_EPOCH_BLOCKS) == 0:
+            return ses
     return None, uint32(0)
 
 
@@ -1559,9 +1723,8 @@ def get_sp_total_iters(constants: ConsensusConstants, is_overflow: bool, ssi: ui
     assert sub_slot_data.signage_point_index is not None
     sp_iters: uint64 = calculate_sp_iters(constants, ssi, sub_slot_data.signage_point_index)
     ip_iters: uint64 = sub_slot_data.cc_ip_vdf_info.number_of_iterations
-    sp_sub_slot_total_iters = uint128(sub_slot_data.total_iters - ip_iters)
-    if is_overflow:
-        sp_sub_slot_total_iters = uint128(sp_sub_slot_total_iters - ssi)
+    # an overflow block's signage point is in the previous sub slot, ssi iterations back
+    sp_sub_slot_total_iters = uint128(sub_slot_data.total_iters - ip_iters - is_overflow * ssi)
     return sp_sub_slot_total_iters + sp_iters
 
 
@@ -1578,31 +1741,37 @@ def blue_boxed_end_of_slot(sub_slot: EndOfSubSlotBundle):
 def validate_sub_epoch_sampling(rng, sub_epoch_weight_list, weight_proof):
     tip = weight_proof.recent_chain_data[-1]
     weight_to_check = _get_weights_for_sampling(rng, tip.weight, weight_proof.recent_chain_data)
-    sampled_sub_epochs: Dict[int, bool] = {}
-    for idx in range(1, len(sub_epoch_weight_list)):
-        if _sample_sub_epoch(sub_epoch_weight_list[idx - 1], sub_epoch_weight_list[idx], weight_to_check):
-            sampled_sub_epochs[idx - 1] = True
+    sampled_sub_epochs: Set[int] = set()
+    if weight_to_check is None:
+        sampled_sub_epochs.update(range(min(len(sub_epoch_weight_list) - 1, WeightProofHandler.MAX_SAMPLES)))
+    else:
+        # both lists are sorted, so place each sampled weight in its sub epoch instead of scanning every sub epoch,
+        # a weight equal to a sub epoch boundary does not sample either neighbour
+        for weight in weight_to_check:
+            idx = bisect_left(sub_epoch_weight_list, weight)
+            if idx == 0 or idx == len(sub_epoch_weight_list) or sub_epoch_weight_list[idx] == weight:
+                continue
+            sampled_sub_epochs.add(idx - 1)
             if len(sampled_sub_epochs) == WeightProofHandler.MAX_SAMPLES:
                 break
     curr_sub_epoch_n = -1
     for sub_epoch_segment in weight_proof.sub_epoch_segments:
         if curr_sub_epoch_n < sub_epoch_segment.sub_epoch_n:
-            if sub_epoch_segment.sub_epoch_n in sampled_sub_epochs:
-                del sampled_sub_epochs[sub_epoch_segment.sub_epoch_n]
+            sampled_sub_epochs.discard(sub_epoch_segment.sub_epoch_n)
         curr_sub_epoch_n = sub_epoch_segment.sub_epoch_n
-    if len(sampled_sub_epochs) > 0:
-        return False
-    return True
+    return len(sampled_sub_epochs) == 0
 
 
 def map_segments_by_sub_epoch(sub_epoch_segments) -> Dict[int, List[SubEpochChallengeSegment]]:
     segments: Dict[int, List[SubEpochChallengeSegment]] = {}
     curr_sub_epoch_n = -1
-    for idx, segment in enumerate(sub_epoch_segments):
-        if curr_sub_epoch_n < segment.sub_epoch_n:
-            curr_sub_epoch_n = segment.sub_epoch_n
-            segments[curr_sub_epoch_n] = []
-        segments[curr_sub_epoch_n].append(segment)
+    for sub_epoch_n, group in groupby(sub_epoch_segments, key=attrgetter("sub_epoch_n")):
+        if curr_sub_epoch_n < sub_epoch_n:
+            curr_sub_epoch_n = sub_epoch_n
+            segments[curr_sub_epoch_n] = list(group)
+        else:
+            # segments of an earlier sub epoch that come out of order stay with the current one
+            segments[curr_sub_epoch_n].extend(group)
     return segments
 
 
@@ -1642,9 +1811,15 @@ def _validate_vdf_batch(
     shutdown_file_path: Optional[pathlib.Path] = None,
 ):
 
+    # most inputs are the default element of normalized proofs, parse each distinct input once.
+    # Keyed on the raw bytes, which hash and compare much faster than the ClassgroupElement dataclass.
+    class_groups: Dict[bytes, ClassgroupElement] = {}
     for vdf_proof_bytes, class_group_bytes, info in vdf_list:
         vdf = VDFProof.from_bytes(vdf_proof_bytes)
-        class_group = ClassgroupElement.from_bytes(class_group_bytes)
+        class_group = class_groups.get(class_group_bytes)
+        if class_group is None:
+            class_group = ClassgroupElement.from_bytes(class_group_bytes)
+            class_groups[class_group_bytes] = class_group
         vdf_info = VDFInfo.from_bytes(info)
         if not vdf.is_valid(constants, class_group, vdf_info):
             return False
@@ -1680,7 +1855,8 @@ async def validate_weight_proof_inner(
         return False, []
 
     loop = asyncio.get_running_loop()
-    summary_bytes, wp_segment_bytes, wp_recent_chain_bytes = vars_to_bytes(summaries, weight_proof)
+    summary_bytes = [bytes(summary) for summary in summaries]
+    wp_recent_chain_bytes = bytes(RecentChainData(weight_proof.recent_chain_data))
     recent_blocks_validation_task = loop.run_in_executor(
         executor,
         validate_recent_blocks,
@@ -1690,43 +1866,76 @@ async def validate_weight_proof_inner(
         pathlib.Path(shutdown_file_name),
     )
 
+    vdf_tasks: List[asyncio.Future] = []
     if not skip_segment_validation:
-        segments_validated, vdfs_to_validate = _validate_sub_epoch_segments(
-            constants, rng, wp_segment_bytes, summary_bytes, validate_from
-        )
-        await asyncio.sleep(0)  # break up otherwise multi-second sync code
-
-        if not segments_validated:
-            return False, []
-
-        vdf_chunks = chunks(vdfs_to_validate, num_processes)
-        vdf_tasks: List[Awaitable] = []
-        for chunk in vdf_chunks:
-            byte_chunks = []
-            for vdf_proof, classgroup, vdf_info in chunk:
-                byte_chunks.append((bytes(vdf_proof), bytes(classgroup), bytes(vdf_info)))
-            vdf_task = asyncio.get_running_loop().run_in_executor(
-                executor,
-                _validate_vdf_batch,
-                constants,
-                byte_chunks,
-                pathlib.Path(shutdown_file_name),
+        # sub epochs are validated independently of each other, split them over the workers instead of
+        # running all of them in a single one
+        segments_by_sub_epoch = map_segments_by_sub_epoch(weight_proof.sub_epoch_segments)
+        sampled_seg_indexes = _sample_segment_indexes(rng, segments_by_sub_epoch)
+        # sub epochs before validate_from only get their reward chain hash checked, which just needs the first
+        # segment, don't serialize and send the rest to the workers
+        sub_epochs = [
+            (sub_epoch_n, segments if sub_epoch_n >= validate_from else segments[:1])
+            for sub_epoch_n, segments in segments_by_sub_epoch.items()
+        ]
+        segment_tasks: List[asyncio.Future] = []
+        for sub_epoch_chunk in chunks(sub_epochs, math.ceil(len(sub_epochs) / num_processes)):
+            segment_tasks.append(
+                loop.run_in_executor(
+                    executor,
+                    _validate_sub_epoch_segments_batch,
+                    constants,
+                    bytes(SubEpochSegments([segment for _, segments in sub_epoch_chunk for segment in segments])),
+                    {sub_epoch_n: sampled_seg_indexes[sub_epoch_n] for sub_epoch_n, _ in sub_epoch_chunk},
+                    summary_bytes,
+                    validate_from,
+                    pathlib.Path(shutdown_file_name),
+                )
             )
-            vdf_tasks.append(vdf_task)
-            # give other stuff a turn
             await asyncio.sleep(0)
 
-        for vdf_task in asyncio.as_completed(fs=vdf_tasks):
-            validated = await vdf_task
-            if not validated:
+        # the vdfs of a group are checked as soon as the group is done, while the other groups are still running.
+        # A few batches per worker, large enough to amortize the submit and pickling overhead per task while still
+        # allowing an early exit when one of the batches fails
+        for segment_task in asyncio.as_completed(segment_tasks):
+            segments_validated, vdfs_to_validate = await segment_task
+            if not segments_validated:
+                for pending_task in [*segment_tasks, *vdf_tasks]:
+                    pending_task.cancel()
+                recent_blocks_validation_task.cancel()
                 return False, []
 
-    valid_recent_blocks, records_bytes = await recent_blocks_validation_task
-
-    if not valid_recent_blocks or records_bytes is None:
-        log.error("failed validating weight proof recent blocks")
-        # Verify the data
-        return False, []
+            batch_size = math.ceil(len(vdfs_to_validate) / 4)
+            for chunk in chunks(vdfs_to_validate, batch_size):
+                vdf_task = loop.run_in_executor(
+                    executor,
+                    _validate_vdf_batch,
+                    constants,
+                    chunk,
+                    pathlib.Path(shutdown_file_name),
+                )
+                vdf_tasks.append(vdf_task)
+                # give other stuff a turn
+                await asyncio.sleep(0)
+
+    # the first failure, of a vdf batch or of the recent blocks, decides the result. Batches that are still
+    # queued behind it are cancelled instead of keeping the workers busy with a proof we already rejected.
+    pending: Set[asyncio.Future] = {recent_blocks_validation_task, *vdf_tasks}
+    while len(pending) > 0:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task is recent_blocks_validation_task:
+                valid_recent_blocks, records_bytes = task.result()
+                valid = valid_recent_blocks and records_bytes is not None
+                if not valid:
+                    log.error("failed validating weight proof recent blocks")
+            else:
+                valid = task.result()
+            if not valid:
+                for pending_task in pending:
+                    pending_task.cancel()
+                return False, []
 
+    _, records_bytes = recent_blocks_validation_task.result()
     records = [BlockRecord.from_bytes(b) for b in records_bytes]
     return True, records
@@ -27,9 +27,13 @@ class ClassgroupElement(Streamable):
     @staticmethod
     def get_default_element() -> "ClassgroupElement":
         # Bit 3 in the first byte of serialized compressed form indicates if
-        # it's the default generator element.
-        return ClassgroupElement.from_bytes(b"\x08")
+        # it's the default generator element. It's immutable, so one instance is shared instead of padding and
+        # building a new element on every call.
+        return _DEFAULT_ELEMENT
 
     @staticmethod
     def get_size(constants: ConsensusConstants):
         return 100
+
+
+_DEFAULT_ELEMENT = ClassgroupElement.from_bytes(b"\x08")
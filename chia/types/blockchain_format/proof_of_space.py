@@ -52,13 +52,17 @@ class ProofOfSpace(Streamable):
             log.error("Fail 4")
             return None
         plot_id: bytes32 = self.get_plot_id()
-        new_challenge: bytes32 = ProofOfSpace.calculate_pos_challenge(plot_id, original_challenge_hash, signage_point)
+        # the pos challenge is the hash of the plot filter input, compute that input once for both checks
+        plot_filter_input: bytes32 = ProofOfSpace.calculate_plot_filter_input(
+            plot_id, original_challenge_hash, signage_point
+        )
+        new_challenge: bytes32 = std_hash(plot_filter_input)
 
         if new_challenge != self.challenge:
             log.error("New challenge is not challenge")
             return None
 
-        if not ProofOfSpace.passes_plot_filter(constants, plot_id, original_challenge_hash, signage_point):
+        if not ProofOfSpace._plot_filter_input_passes(constants, plot_filter_input):
             log.error("Fail 5")
             return None
 
@@ -77,9 +81,13 @@ class ProofOfSpace(Streamable):
         challenge_hash: bytes32,
         signage_point: bytes32,
     ) -> bool:
-        plot_filter: BitArray = BitArray(
-            ProofOfSpace.calculate_plot_filter_input(plot_id, challenge_hash, signage_point)
+        return ProofOfSpace._plot_filter_input_passes(
+            constants, ProofOfSpace.calculate_plot_filter_input(plot_id, challenge_hash, signage_point)
         )
+
+    @staticmethod
+    def _plot_filter_input_passes(constants: ConsensusConstants, plot_filter_input: bytes32) -> bool:
+        plot_filter: BitArray = BitArray(plot_filter_input)
         return plot_filter[: constants.NUMBER_ZERO_BITS_PLOT_FILTER].uint == 0
 
     @staticmethod
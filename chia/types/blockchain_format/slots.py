@@ -9,7 +9,7 @@ from chia.types.blockchain_format.proof_of_space import ProofOfSpace
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.types.blockchain_format.vdf import VDFInfo, VDFProof
 from chia.util.ints import uint8, uint64
-from chia.util.streamable import Streamable, streamable
+from chia.util.streamable import PackedStreamable, Streamable, streamable
 
 
 @streamable
@@ -23,7 +23,7 @@ class ChallengeBlockInfo(Streamable):  # The hash of this is used as the challen
 
 @streamable
 @dataclass(frozen=True)
-class ChallengeChainSubSlot(Streamable):
+class ChallengeChainSubSlot(PackedStreamable):
     challenge_chain_end_of_slot_vdf: VDFInfo
     infused_challenge_chain_sub_slot_hash: Optional[bytes32]  # Only at the end of a slot
     subepoch_summary_hash: Optional[bytes32]  # Only once per sub-epoch, and one sub-epoch delayed
@@ -36,6 +36,23 @@ class SubEpochData(Streamable):
 @streamable
 @dataclass(frozen=True)
 class SubSlotData(Streamable):
+    # Weight proofs hold tens of thousands of these, so avoid a `__dict__` per instance.
+    __slots__ = (
+        "proof_of_space",
+        "cc_signage_point",
+        "cc_infusion_point",
+        "icc_infusion_point",
+        "cc_sp_vdf_info",
+        "signage_point_index",
+        "cc_slot_end",
+        "icc_slot_end",
+        "cc_slot_end_info",
+        "icc_slot_end_info",
+        "cc_ip_vdf_info",
+        "icc_ip_vdf_info",
+        "total_iters",
+    )
+
     # if infused
     proof_of_space: Optional[ProofOfSpace]
     # VDF to signage point
@@ -70,6 +87,8 @@ class SubSlotData(Streamable):
 @streamable
 @dataclass(frozen=True)
 class SubEpochChallengeSegment(Streamable):
+    __slots__ = ("sub_epoch_n", "sub_slots", "rc_slot_end_info")
+
     sub_epoch_n: uint32
     sub_slots: List[SubSlotData]
     rc_slot_end_info: Optional[VDFInfo]  # in first segment of each sub_epoch
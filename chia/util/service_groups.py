@@ -1,4 +1,5 @@
-from typing import KeysView, Generator
+from itertools import chain
+from typing import FrozenSet, KeysView, Generator, Set
 
 SERVICES_FOR_GROUP = {
     "all": (
@@ -24,16 +25,23 @@ SERVICES_FOR_GROUP = {
     "seeder-only": "chia_seeder".split(),
 }
 
+# every service of any group, for constant time lookups in validate_service
+_ALL_SERVICES: FrozenSet[str] = frozenset(chain.from_iterable(SERVICES_FOR_GROUP.values()))
+
 
 def all_groups() -> KeysView[str]:
     return SERVICES_FOR_GROUP.keys()
 
 
 def services_for_groups(groups) -> Generator[str, None, None]:
+    # groups overlap (`farmer` and `node` both run the full node), yield every service only once
+    seen: Set[str] = set()
     for group in groups:
         for service in SERVICES_FOR_GROUP[group]:
-            yield service
+            if service not in seen:
+                seen.add(service)
+                yield service
 
 
 def validate_service(service: str) -> bool:
-    return any(service in _ for _ in SERVICES_FOR_GROUP.values())
+    return service in _ALL_SERVICES
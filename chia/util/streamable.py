@@ -26,9 +26,10 @@ from blspy import G1Element, G2Element, PrivateKey
 from typing_extensions import Literal, get_args, get_origin
 
 from chia.types.blockchain_format.sized_bytes import bytes32
-from chia.util.byte_types import hexstr_to_bytes
+from chia.util.byte_types import SizedBytes, hexstr_to_bytes
 from chia.util.hash import std_hash
 from chia.util.ints import uint32
+from chia.util.struct_stream import StructStream
 
 pp = pprint.PrettyPrinter(indent=1, width=120, compact=True)
 
@@ -98,6 +99,7 @@ _T_Streamable = TypeVar("_T_Streamable", bound="Streamable")
 ParseFunctionType = Callable[[BinaryIO], object]
 StreamFunctionType = Callable[[object, BinaryIO], None]
 ConvertFunctionType = Callable[[object], object]
+PackFunctionType = Callable[[Any], bytes]
 
 
 @dataclasses.dataclass(frozen=True)
@@ -526,6 +528,26 @@ def function_to_stream_one_item(f_type: Type[Any]) -> StreamFunctionType:
         raise UnsupportedType(f"can't stream {f_type}")
 
 
+def function_to_pack_one_item(f_type: Type[Any]) -> PackFunctionType:
+    """
+    Returns a function that gives the same bytes as the stream function of `f_type` writes, without a stream.
+    """
+    if is_type_SpecificOptional(f_type):
+        pack_inner_type_func = function_to_pack_one_item(get_args(f_type)[0])
+        return lambda item: b"\x00" if item is None else b"\x01" + pack_inner_type_func(item)
+    if isinstance(f_type, type) and issubclass(f_type, (Streamable, SizedBytes, StructStream)):
+        # these stream exactly their `__bytes__`
+        return bytes
+    stream_func = function_to_stream_one_item(f_type)
+
+    def pack_streamed(item: object) -> bytes:
+        f = io.BytesIO()
+        stream_func(item, f)
+        return f.getvalue()
+
+    return pack_streamed
+
+
 def streamable(cls: Type[_T_Streamable]) -> Type[_T_Streamable]:
     """
     This decorator forces correct streamable protocol syntax/usage and populates the caches for types hints and
@@ -558,6 +580,8 @@ def streamable(cls: Type[_T_Streamable]) -> Type[_T_Streamable]:
         raise DefinitionError("Streamable inheritance required.", cls)
 
     cls._streamable_fields = create_fields(cls)
+    if issubclass(cls, PackedStreamable):
+        cls._pack_functions = tuple(function_to_pack_one_item(field.type) for field in cls._streamable_fields)
 
     return cls
 
@@ -607,6 +631,9 @@ class Streamable:
     Make sure to use the streamable decorator when inheriting from the Streamable class to prepare the streaming caches.
     """
 
+    # Empty so subclasses can opt into `__slots__` and drop the per instance `__dict__`.
+    __slots__ = ()
+
     _streamable_fields: ClassVar[StreamableFields]
 
     @classmethod
@@ -614,16 +641,24 @@ class Streamable:
         return cls._streamable_fields
 
     def __post_init__(self) -> None:
-        data = self.__dict__
         try:
             for field in self._streamable_fields:
-                object.__setattr__(self, field.name, field.post_init_function(data[field.name]))
+                object.__setattr__(self, field.name, field.post_init_function(getattr(self, field.name)))
         except TypeError as e:
-            missing_fields = [field.name for field in self._streamable_fields if field.name not in data]
+            missing_fields = [field.name for field in self._streamable_fields if not hasattr(self, field.name)]
             if len(missing_fields) > 0:
                 raise ParameterMissingError(type(self), missing_fields) from e
             raise
 
+    def __setstate__(self, state: Any) -> None:
+        # pickle restores attributes with setattr, which frozen dataclasses reject. Classes with `__slots__` hand
+        # their state over as a `(__dict__, slots)` pair.
+        if isinstance(state, tuple):
+            dict_state, slots_state = state
+            state = {**(dict_state or {}), **(slots_state or {})}
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     @classmethod
     def parse(cls: Type[_T_Streamable], f: BinaryIO) -> _T_Streamable:
         # Create the object without calling __init__() to avoid unnecessary post-init checks in strictdataclass
@@ -664,3 +699,40 @@ class Streamable:
     @classmethod
     def from_json_dict(cls: Type[_T_Streamable], json_dict: Dict[str, Any]) -> _T_Streamable:
         return streamable_from_dict(cls, json_dict)
+
+
+class PackedStreamable(Streamable):
+    """
+    A Streamable for objects that are serialized or hashed over and over. The bytes are joined from the packed
+    fields instead of streamed one field at a time, and they and the hash are memoized since the object is immutable.
+    The memos live in declared slots, they are not fields and are never serialized.
+    """
+
+    __slots__ = ("_cached_bytes", "_cached_hash")
+
+    _cached_bytes: bytes
+    _cached_hash: bytes32
+    _pack_functions: ClassVar[Tuple[PackFunctionType, ...]]
+
+    def stream(self, f: BinaryIO) -> None:
+        f.write(bytes(self))
+
+    def __bytes__(self) -> bytes:
+        try:
+            return self._cached_bytes
+        except AttributeError:
+            pass
+        data = b"".join(
+            pack(getattr(self, field.name)) for pack, field in zip(self._pack_functions, self._streamable_fields)
+        )
+        object.__setattr__(self, "_cached_bytes", data)
+        return data
+
+    def get_hash(self) -> bytes32:
+        try:
+            return self._cached_hash
+        except AttributeError:
+            pass
+        object_hash = super().get_hash()
+        object.__setattr__(self, "_cached_hash", object_hash)
+        return object_hash
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, List
+
+import pytest
+
+from chia.consensus.block_rewards import (
+    calculate_base_farmer_reward,
+    calculate_base_farmer_rewards,
+    calculate_community_reward,
+    calculate_community_rewards,
+    calculate_pool_reward,
+    calculate_pool_rewards,
+    calculate_staking_reward,
+    calculate_staking_rewards,
+    calculate_timelord_reward,
+    calculate_timelord_rewards,
+)
+from chia.util.ints import uint32, uint64
+
+_blocks_per_year = 1681920
+_mojo_per_hydrangea = 1000000000000
+
+
+def _expected_reward(per_block_hydrangea_mojo: int, prefarm_mojo: int, height: int) -> int:
+    if height == 0:
+        return prefarm_mojo
+    for era in range(4):
+        if height < (era + 1) * 3 * _blocks_per_year:
+            return per_block_hydrangea_mojo >> era
+    return per_block_hydrangea_mojo >> 4
+
+
+@pytest.mark.parametrize(
+    "calculate, per_block, prefarm",
+    [
+        (calculate_pool_reward, 90 * _mojo_per_hydrangea, 15120000 * _mojo_per_hydrangea),
+        (calculate_community_reward, 20 * _mojo_per_hydrangea, 3360000 * _mojo_per_hydrangea),
+        (calculate_staking_reward, 5 * _mojo_per_hydrangea, 840000 * _mojo_per_hydrangea),
+        (calculate_base_farmer_reward, 10 * _mojo_per_hydrangea, 1680000 * _mojo_per_hydrangea),
+        (calculate_timelord_reward, _mojo_per_hydrangea // 1000, 168 * _mojo_per_hydrangea),
+    ],
+)
+def test_reward_schedule(calculate: Callable[[uint32], uint64], per_block: int, prefarm: int) -> None:
+    heights = [0, 1, 2, 12 * _blocks_per_year + 1, 100 * _blocks_per_year]
+    for boundary in range(1, 5):
+        heights.extend([boundary * 3 * _blocks_per_year - 1, boundary * 3 * _blocks_per_year])
+    for height in heights:
+        assert calculate(uint32(height)) == _expected_reward(per_block, prefarm, height)
+
+
+@pytest.mark.parametrize(
+    "calculate, calculate_batch",
+    [
+        (calculate_pool_reward, calculate_pool_rewards),
+        (calculate_community_reward, calculate_community_rewards),
+        (calculate_staking_reward, calculate_staking_rewards),
+        (calculate_base_farmer_reward, calculate_base_farmer_rewards),
+        (calculate_timelord_reward, calculate_timelord_rewards),
+    ],
+)
+def test_reward_schedule_batch(
+    calculate: Callable[[uint32], uint64], calculate_batch: Callable[[Iterable[uint32]], List[uint64]]
+) -> None:
+    heights = [uint32(h) for h in (0, 1, 3 * _blocks_per_year, 3 * _blocks_per_year - 1, 0, 15 * _blocks_per_year)]
+    assert calculate_batch(heights) == [calculate(h) for h in heights]
+    assert calculate_batch([]) == []
+
+
+def test_rewards_are_shared_uint64_instances() -> None:
+    for calculate in (
+        calculate_pool_reward,
+        calculate_community_reward,
+        calculate_staking_reward,
+        calculate_base_farmer_reward,
+        calculate_timelord_reward,
+    ):
+        for height in (0, 1, 3 * _blocks_per_year):
+            reward = calculate(uint32(height))
+            assert type(reward) is uint64
+            assert calculate(uint32(height)) is reward
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import io
+import pickle
 import re
-from dataclasses import dataclass, field, fields
+from dataclasses import FrozenInstanceError, dataclass, field, fields
 from typing import Any, Callable, Dict, List, Optional, Tuple, Type, get_type_hints
 
 import pytest
@@ -10,19 +11,26 @@ from blspy import G1Element
 from clvm_tools import binutils
 from typing_extensions import Literal, get_args
 
+from chia.full_node.signage_point import SignagePoint
 from chia.protocols.wallet_protocol import RespondRemovals
 from chia.simulator.block_tools import BlockTools
+from chia.types.blockchain_format.classgroup import ClassgroupElement
 from chia.types.blockchain_format.coin import Coin
 from chia.types.blockchain_format.program import Program
 from chia.types.blockchain_format.sized_bytes import bytes4, bytes32
+from chia.types.blockchain_format.slots import ChallengeChainSubSlot
+from chia.types.blockchain_format.sub_epoch_summary import SubEpochSummary
+from chia.types.blockchain_format.vdf import VDFInfo, VDFProof
 from chia.types.full_block import FullBlock
 from chia.types.weight_proof import SubEpochChallengeSegment
+from chia.util.hash import std_hash
 from chia.util.ints import uint8, uint32, uint64
 from chia.util.streamable import (
     ConversionError,
     DefinitionError,
     InvalidSizeError,
     InvalidTypeError,
+    PackedStreamable,
     ParameterMissingError,
     Streamable,
     UnsupportedType,
@@ -411,6 +419,15 @@ class PostInitTestClassTuple(Streamable):
     b: Tuple[Tuple[uint8, str], bytes32]
 
 
+@streamable
+@dataclass(frozen=True)
+class PostInitTestClassSlots(Streamable):
+    __slots__ = ("a", "b")
+
+    a: uint8
+    b: Optional[bytes32]
+
+
 @pytest.mark.parametrize(
     "test_class, args",
     [
@@ -420,6 +437,7 @@ class PostInitTestClassTuple(Streamable):
         (PostInitTestClassList, ([1, 2, 3], [[G1Element(), bytes(G1Element())], [bytes(G1Element())]])),
         (PostInitTestClassTuple, ((1, "test"), ((200, "test_2"), b"\xba" * 32))),
         (PostInitTestClassOptional, (12, None, 13, None)),
+        (PostInitTestClassSlots, (12, b"\x1a" * 32)),
     ],
 )
 def test_post_init_valid(test_class: Type[Any], args: Tuple[Any, ...]) -> None:
@@ -440,7 +458,7 @@ def test_post_init_valid(test_class: Type[Any], args: Tuple[Any, ...]) -> None:
     hints = get_type_hints(test_class)
     test_fields = {field.name: hints.get(field.name, field.type) for field in fields(test_class)}
     for field_name, field_type in test_fields.items():
-        assert validate_item_type(field_type, test_object.__dict__[field_name])
+        assert validate_item_type(field_type, getattr(test_object, field_name))
 
 
 @pytest.mark.parametrize(
@@ -466,6 +484,15 @@ def test_post_init_failures(test_class: Type[Any], args: Tuple[Any, ...], expect
         test_class(*args)
 
 
+def test_slots() -> None:
+    item = PostInitTestClassSlots(uint8(1), None)
+    assert not hasattr(item, "__dict__")
+    assert PostInitTestClassSlots.from_bytes(bytes(item)) == item
+    with pytest.raises(FrozenInstanceError):
+        item.a = uint8(2)  # type: ignore[misc]
+    assert pickle.loads(pickle.dumps(item)) == item
+
+
 def test_basic() -> None:
     @streamable
     @dataclass(frozen=True)
@@ -913,3 +940,63 @@ def test_streamable_inheritance_missing() -> None:
 def test_unsupported_types(method: Callable[[object], object], input_type: object) -> None:
     with pytest.raises(UnsupportedType):
         method(input_type)
+
+
+_vdf_info = VDFInfo(bytes32(b"c" * 32), uint64(1000), ClassgroupElement.get_default_element())
+_vdf_proof = VDFProof(uint8(0), b"proof", False)
+
+
+@streamable
+@dataclass(frozen=True)
+class PackedTestClass(PackedStreamable):
+    a: bytes32
+    b: uint8
+    c: Optional[uint64]
+    d: Optional[bytes32]
+    e: List[uint32]
+    f: bytes
+    g: str
+    h: bool
+    i: Tuple[uint32, str]
+    j: Optional[VDFInfo]
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        PackedTestClass(bytes32(b"a" * 32), uint8(1), None, None, [], b"", "", False, (uint32(0), ""), None),
+        PackedTestClass(
+            bytes32(b"a" * 32),
+            uint8(255),
+            uint64(2**64 - 1),
+            bytes32(b"d" * 32),
+            [uint32(1), uint32(2)],
+            b"bytes",
+            "str",
+            True,
+            (uint32(3), "tuple"),
+            _vdf_info,
+        ),
+        SubEpochSummary(bytes32(b"a" * 32), bytes32(b"b" * 32), uint8(255), None, None),
+        SubEpochSummary(bytes32(b"a" * 32), bytes32(b"b" * 32), uint8(0), uint64(1), uint64(1234567)),
+        ChallengeChainSubSlot(_vdf_info, None, None, None, None),
+        ChallengeChainSubSlot(_vdf_info, bytes32(b"i" * 32), bytes32(b"s" * 32), uint64(0), uint64(2**64 - 1)),
+        SignagePoint(None, None, None, None, None),
+        SignagePoint(_vdf_info, _vdf_proof, _vdf_info, _vdf_proof, bytes32(b"t" * 32)),
+    ],
+)
+def test_packed_streamable(item: PackedStreamable) -> None:
+    # the packed bytes have to match the generic streamable encoding of the fields
+    f = io.BytesIO()
+    Streamable.stream(item, f)
+    expected_serialization = f.getvalue()
+
+    assert bytes(item) == expected_serialization
+    assert bytes(item) is bytes(item)
+    assert item.get_hash() == std_hash(expected_serialization)
+    assert type(item).from_bytes(expected_serialization) == item
+    # the memos are not part of the object's state
+    assert "_cached_bytes" not in getattr(item, "__dict__", {})
+    assert "_cached_hash" not in getattr(item, "__dict__", {})
+    assert "_cached_bytes" not in item.to_json_dict()
+    assert pickle.loads(pickle.dumps(item)) == item
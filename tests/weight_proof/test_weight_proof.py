@@ -1,4 +1,7 @@
+import asyncio
 import sys
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Tuple
 
 import aiosqlite
@@ -15,6 +18,7 @@ from chia.simulator.block_tools import test_constants
 from chia.util.generator_tools import get_block_header
 
 from chia.consensus.pot_iterations import calculate_iterations_quality
+from chia.full_node import weight_proof
 from chia.full_node.weight_proof import (
     WeightProofHandler,
     _map_sub_epoch_summaries,
@@ -511,6 +515,125 @@ class TestWeightProof:
         print(f"size of proof is {get_size(wp)}")
 
 
+
+class _SlowSegmentStore:
+    """
+    Only the segment lookup of a blockchain, it blocks until released so builds can be cancelled while they run.
+    """
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.lookups = 0
+
+    async def get_sub_epoch_challenge_segments(self, ses_block_hash: bytes32):
+        self.lookups += 1
+        await self.release.wait()
+        return []
+
+
+def _get_segments_task(wpf: WeightProofHandler, ses_block) -> asyncio.Task:
+    return asyncio.create_task(wpf._WeightProofHandler__get_sub_epoch_segments(None, ses_block, uint32(0), 1))
+
+
+class TestSubEpochSegmentTasks:
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_shared_build(self):
+        store = _SlowSegmentStore()
+        wpf = WeightProofHandler(DEFAULT_CONSTANTS, store)
+        ses_block = SimpleNamespace(header_hash=bytes32(b"a" * 32))
+        first = _get_segments_task(wpf, ses_block)
+        second = _get_segments_task(wpf, ses_block)
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert len(wpf._segment_tasks) == 1
+        store.release.set()
+        assert await second == []
+        assert first.cancelled()
+        assert store.lookups == 1
+        assert wpf._segment_tasks == {}
+        assert wpf._segment_waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_last_cancelled_caller_cancels_build(self):
+        wpf = WeightProofHandler(DEFAULT_CONSTANTS, _SlowSegmentStore())
+        ses_block = SimpleNamespace(header_hash=bytes32(b"a" * 32))
+        callers = [_get_segments_task(wpf, ses_block) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        (build,) = wpf._segment_tasks.values()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert build.cancelled()
+        assert wpf._segment_tasks == {}
+        assert wpf._segment_waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_shut_down_cancels_build(self):
+        wpf = WeightProofHandler(DEFAULT_CONSTANTS, _SlowSegmentStore())
+        caller = _get_segments_task(wpf, SimpleNamespace(header_hash=bytes32(b"a" * 32)))
+        await asyncio.sleep(0.01)
+        (build,) = wpf._segment_tasks.values()
+        wpf.shut_down()
+        await asyncio.gather(caller, return_exceptions=True)
+        assert build.cancelled()
+        assert caller.cancelled()
+        assert wpf._segment_tasks == {}
+        assert wpf._segment_waiters == {}
+
+
+class _StubPool:
+    def __init__(self) -> None:
+        self.shutdowns = 0
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.shutdowns += 1
+
+
+class TestConcurrentValidation:
+    @pytest.mark.asyncio
+    async def test_broken_pool_leaves_replacement_running(self, monkeypatch):
+        # each validation blocks on its own future until the test resolves it
+        calls: List[Tuple[object, asyncio.Future]] = []
+
+        async def validate_inner(constants, executor, *args):
+            result: asyncio.Future = asyncio.get_running_loop().create_future()
+            calls.append((executor, result))
+            return await result
+
+        monkeypatch.setattr(weight_proof, "validate_weight_proof_inner", validate_inner)
+        monkeypatch.setattr(weight_proof, "_validate_sub_epoch_summaries", lambda constants, wp: ([], []))
+        wpf = WeightProofHandler(DEFAULT_CONSTANTS, SimpleNamespace())
+        monkeypatch.setattr(wpf, "get_fork_point", lambda summaries: (uint32(0), 0))
+        wp = SimpleNamespace(sub_epochs=[None])
+
+        broken_pool = _StubPool()
+        wpf._executor = broken_pool
+        first = asyncio.create_task(wpf.validate_weight_proof(wp))
+        second = asyncio.create_task(wpf.validate_weight_proof(wp))
+        await asyncio.sleep(0.01)
+        calls[0][1].set_exception(BrokenProcessPool())
+        assert await first == (False, 0, [])
+        assert wpf._executor is None
+
+        # a validation starting now gets a new pool while the second one is still waiting on the broken one
+        new_pool = _StubPool()
+        wpf._executor = new_pool
+        third = asyncio.create_task(wpf.validate_weight_proof(wp))
+        await asyncio.sleep(0.01)
+        assert [executor for executor, _ in calls] == [broken_pool, broken_pool, new_pool]
+
+        calls[1][1].set_exception(BrokenProcessPool())
+        assert await second == (False, 0, [])
+        assert wpf._executor is new_pool
+        assert new_pool.shutdowns == 0
+
+        calls[2][1].set_result((True, []))
+        assert await third == (True, 0, [])
+        assert broken_pool.shutdowns > 0
+
+
 def get_size(obj, seen=None):
     """Recursively finds size of objects"""
     size = sys.getsizeof(obj)